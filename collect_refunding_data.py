@@ -1,14 +1,50 @@
+from __future__ import annotations
+
 import argparse
 
 import csv
+import hashlib
+import importlib.util
 import io
+import json
+import mmap
+import os
 import re
-from datetime import datetime
-from typing import Dict, Iterable, List, Optional, Tuple
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from enum import Enum
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
-import pdfplumber
-import requests
-from bs4 import BeautifulSoup, Tag
+# pdfplumber, requests and BeautifulSoup dominate start-up time, so they are imported by the functions that use
+# them; `check` and other light paths never pay for PDF parsing.
+if TYPE_CHECKING:
+    import cProfile
+    from concurrent.futures import ProcessPoolExecutor
+
+    import pdfplumber
+    import requests
+    from bs4 import BeautifulSoup, SoupStrainer, Tag
 
 BASE_URL = "https://home.treasury.gov"
 RECOMMENDED_TABLES_URL = (
@@ -20,11 +56,181 @@ OFFICIAL_REMARKS_URL = (
     "quarterly-refunding/quarterly-refunding-archives/official-remarks-on-quarterly-refunding-by-calendar-year"
 )
 DEFAULT_MAX_QUARTERS = 23
+DEFAULT_CONCURRENCY = 4
+DEFAULT_CONNECTIONS_PER_HOST = 4
+REQUEST_TIMEOUT = 60
+DEFAULT_RETRIES = 4
+DEFAULT_BACKOFF_FACTOR = 1.0
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+DEFAULT_RATE_LIMIT = 4.0
+DEFAULT_RATE_BURST = 8
+DEFAULT_CACHE_DIR = ".refunding_cache"
+DEFAULT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+PARSE_CACHE_FILENAME = "parsed.sqlite3"
+CHECKPOINT_DIRNAME = "checkpoints"
+CHECKPOINT_MANIFEST = "manifest.json"
+WATCH_STATE_FILENAME = "watch_state.json"
+DEFAULT_WATCH_INTERVAL = 300.0
+DEFAULT_WATCH_MAX_INTERVAL = 6 * 3600.0
+# Refundings are announced from the last days of January/April/July/October into the first days of the
+# following month; polling tightens inside that window.
+ANNOUNCEMENT_MONTHS = (2, 5, 8, 11)
+ANNOUNCEMENT_LEAD_DAYS = 7
+ANNOUNCEMENT_WINDOW_DAYS = 10
+WATCH_MAX_QUARTER_FAILURES = 5
+SQLITE_TABLE = "refunding_data"
+OUTPUT_BATCH_SIZE = 10000
+PARSER_VERSION = 1
+CSV_FIELDNAMES = [
+    "Quarter_year",
+    "Date",
+    "Security_type",
+    "Maturity",
+    "Units",
+    "Auction_month",
+    "Auction_date",
+    "Offered_amount",
+    "Data_type",
+    "Notes",
+]
+
+CLASSIFICATION_CACHE_SIZE = 1024
+_ORDINAL_PATTERN = re.compile(r"(\d+)(?:st|nd|rd|th)")
+_QUARTER_LABEL_PATTERN = re.compile(r"^Q([1-4]) ((?:19|20)\d{2})$")
+_QUARTER_PATTERN = re.compile(r"Q([1-4])\b", re.IGNORECASE)
+_YEAR_PATTERN = re.compile(r"(19|20)\d{2}")
+_QUARTER_TABLE_LABEL = re.compile(r"Quarter", re.IGNORECASE)
+_MATURITY_PATTERN = re.compile(r"(\d+)(?:\s*-?\s*)(Year|Month|Week|Day)", re.IGNORECASE)
+_MONTH_CELL_PATTERN = re.compile(r"[A-Za-z]{3}-\d{2}$")
+_AMOUNT_CELL_PATTERN = re.compile(r"^\d+(?:\.\d+)?$")
+_RECOMMENDED_LINE_PATTERN = re.compile(
+    r"^(?P<security>[A-Za-z0-9/\-\(\)\s]+?)\s+"
+    r"(?P<date>\d{1,2}/\d{1,2})\s+"
+    r"(?P<offered>\d+\.\d{2})\s+"
+    r"(?P<maturing>\d+\.\d{2})"
+    r"(?:\s+(?P<new_money>\d+\.\d{2}))?"
+    r"(?:\s+(?P<change>\d+\.\d{2}))?"
+    r"$"
+)
+
+_OFFICIAL_ARTICLE_FIELDS = frozenset({"field--name-field-news-publication-date", "field--name-field-news-body"})
+
+
+def _is_official_article_field(class_value: Optional[str]) -> bool:
+    return isinstance(class_value, str) and not _OFFICIAL_ARTICLE_FIELDS.isdisjoint(class_value.split())
+
+
+# Only the subtrees the parsers read are materialised; the rest of the page is skipped by the tree builder.
+@lru_cache(maxsize=None)
+def _official_article_strainer() -> SoupStrainer:
+    from bs4 import SoupStrainer
+
+    return SoupStrainer("div", attrs={"class": _is_official_article_field})
+
+
+@lru_cache(maxsize=None)
+def _quarter_table_strainer() -> SoupStrainer:
+    from bs4 import SoupStrainer
+
+    return SoupStrainer("table", attrs={"aria-label": _QUARTER_TABLE_LABEL})
+
+
+NOTE_NET_BILLS = "Net bills issuance for the quarter (recommended table)"
+NOTE_REOPENING = "Reopening"
+NOTE_RECOMMENDED_SCHEDULE = "Recommended financing schedule"
+NOTE_MATRIX_TABLE = "TBAC recommended financing table (matrix format)"
+NOTE_PROJECTED = "Projected auction size from official remarks table"
+NOTE_ACTUAL = "Actual auction size from prior quarter"
+
+
+class _CsvEnum(str, Enum):
+    def __str__(self) -> str:
+        return self.value
+
+
+class SecurityType(_CsvEnum):
+    BILL = "BILL"
+    NOTE = "NOTE"
+    BOND = "BOND"
+    TIPS = "TIPS"
+    FRN = "FRN"
+    SAVINGS = "SAVINGS"
+    OTHER = "OTHER"
+
+
+class DataType(_CsvEnum):
+    RECOMMENDATION_FOR_THIS_REFUNDING = "RECOMMENDATION_FOR_THIS_REFUNDING"
+    INDICATIONS_FOR_NEXT_REFUNDING = "INDICATIONS_FOR_NEXT_REFUNDING"
+    HISTORICAL_REFERENCE = "HISTORICAL_REFERENCE"
+
+
+class Units(_CsvEnum):
+    NONE = ""
+    YEARS = "YEARS"
+    MONTHS = "MONTHS"
+    WEEKS = "WEEKS"
+    DAYS = "DAYS"
+
 
+class RefundingRow(NamedTuple):
+    Quarter_year: str
+    Date: str
+    Security_type: SecurityType
+    Maturity: Optional[float]
+    Units: Units
+    Auction_month: str
+    Auction_date: str
+    Offered_amount: float
+    Data_type: DataType
+    Notes: str
+
+    def csv_values(self) -> Tuple[object, ...]:
+        if self.Maturity is None:
+            return self._replace(Maturity="")
+        return self
+
+    def sql_values(self) -> Tuple[object, ...]:
+        return tuple(
+            value.value or None if isinstance(value, Enum) else value if value != "" else None for value in self
+        )
+
+    def as_csv_dict(self) -> Dict[str, object]:
+        return dict(zip(CSV_FIELDNAMES, self.csv_values()))
+
+    @classmethod
+    def from_values(cls, values: Iterable[object]) -> "RefundingRow":
+        (
+            quarter_year,
+            announcement_date,
+            security_type,
+            maturity,
+            units,
+            auction_month,
+            auction_date,
+            offered_amount,
+            data_type,
+            notes,
+        ) = values
+        return cls(
+            str(quarter_year),
+            str(announcement_date),
+            SecurityType(security_type),
+            None if maturity in ("", None) else float(maturity),
+            Units(units or ""),
+            str(auction_month or ""),
+            str(auction_date or ""),
+            float(offered_amount),
+            DataType(data_type),
+            sys.intern(str(notes or "")),
+        )
+
+    @classmethod
+    def from_csv_dict(cls, row: Dict[str, object]) -> "RefundingRow":
+        return cls.from_values(row[name] for name in CSV_FIELDNAMES)
 
 
 def ordinal_to_int(text: str) -> Optional[int]:
-    match = re.search(r"(\d+)(?:st|nd|rd|th)", text)
+    match = _ORDINAL_PATTERN.search(text)
     return int(match.group(1)) if match else None
 
 
@@ -36,15 +242,527 @@ def format_quarter(year: int, quarter: int) -> str:
     return f"Q{quarter} {year}"
 
 
+def parse_quarter_label(label: str) -> Optional[Tuple[int, int]]:
+    match = _QUARTER_LABEL_PATTERN.match(label.strip())
+    return (int(match.group(2)), int(match.group(1))) if match else None
+
+
+QuarterLinks = Dict[Tuple[int, int], str]
+
+
 def absolute_url(href: str) -> str:
     return href if href.startswith("http") else f"{BASE_URL}{href}"
 
 
-def extract_quarter_links(page_url: str) -> Dict[Tuple[int, int], str]:
-    response = requests.get(page_url, timeout=60)
+class RunMetrics:
+    def __init__(self, profile: bool = False) -> None:
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict[str, float]] = defaultdict(
+            lambda: {"seconds": 0.0, "calls": 0, "max_seconds": 0.0}
+        )
+        self.counters: Dict[str, float] = defaultdict(float)
+        self.quarters: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.failures: Dict[str, str] = {}
+        self.profiler: Optional[cProfile.Profile] = None
+        if profile:
+            import cProfile
+
+            self.profiler = cProfile.Profile()
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, quarter: Optional[str] = None) -> None:
+        with self._lock:
+            totals = self.stages[stage]
+            totals["seconds"] += seconds
+            totals["calls"] += 1
+            totals["max_seconds"] = max(totals["max_seconds"], seconds)
+            if quarter is not None:
+                self.quarters[quarter][f"{stage}_seconds"] += seconds
+
+    def increment(self, counter: str, value: float = 1, quarter: Optional[str] = None) -> None:
+        with self._lock:
+            self.counters[counter] += value
+            if quarter is not None:
+                self.quarters[quarter][counter] += value
+
+    @contextmanager
+    def profiled(self) -> Iterator[None]:
+        if self.profiler is None:
+            yield
+            return
+        self.profiler.enable()
+        try:
+            yield
+        finally:
+            self.profiler.disable()
+
+    @contextmanager
+    def stage(self, stage: str, quarter: Optional[str] = None, profile: bool = False) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            if profile:
+                with self.profiled():
+                    yield
+            else:
+                yield
+        finally:
+            self.record(stage, time.perf_counter() - start, quarter)
+
+    def fail(self, quarter: str, error: BaseException) -> None:
+        with self._lock:
+            self.failures[quarter] = f"{type(error).__name__}: {error}"
+        self.increment("quarters_failed", quarter=quarter)
+
+    def stage_seconds(self, stage: str) -> float:
+        with self._lock:
+            return self.stages[stage]["seconds"] if stage in self.stages else 0.0
+
+    def timed_iter(self, entries: Iterable[RefundingRow], stage: str) -> Iterator[RefundingRow]:
+        # Measures only the time spent producing rows, so a consumer such as a
+        # writer can subtract it from its own duration.
+        iterator = iter(entries)
+        elapsed = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    entry = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    elapsed += time.perf_counter() - start
+                yield entry
+        finally:
+            self.record(stage, elapsed)
+
+    def report(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "wall_seconds": time.perf_counter() - self.started,
+                "stages": {name: dict(values) for name, values in sorted(self.stages.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "quarters": {label: dict(values) for label, values in self.quarters.items()},
+                "failures": dict(self.failures),
+            }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.report(), handle, indent=2)
+            handle.write("\n")
+
+    def prometheus_text(self) -> str:
+        report = self.report()
+        lines = [
+            "# HELP refunding_run_seconds Wall-clock duration of the collection run.",
+            "# TYPE refunding_run_seconds gauge",
+            f"refunding_run_seconds {report['wall_seconds']:.6f}",
+            "# HELP refunding_stage_seconds_total Time spent per pipeline stage.",
+            "# TYPE refunding_stage_seconds_total counter",
+        ]
+        stages = report["stages"]
+        lines.extend(
+            f'refunding_stage_seconds_total{{stage="{name}"}} {values["seconds"]:.6f}'
+            for name, values in stages.items()
+        )
+        lines.extend(
+            [
+                "# HELP refunding_stage_calls_total Number of times each pipeline stage ran.",
+                "# TYPE refunding_stage_calls_total counter",
+            ]
+        )
+        lines.extend(
+            f'refunding_stage_calls_total{{stage="{name}"}} {int(values["calls"])}' for name, values in stages.items()
+        )
+        for counter, value in report["counters"].items():
+            metric = "refunding_" + re.sub(r"[^a-zA-Z0-9_]", "_", counter) + "_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(self.prometheus_text())
+
+    def write_profile(self, path: str) -> None:
+        if self.profiler is not None:
+            self.profiler.dump_stats(path)
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rate: float,
+        burst: int = DEFAULT_RATE_BURST,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        # Callers reserve a token under the lock and sleep outside it, so waiting threads queue in arrival order.
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            self._sleep(delay)
+        return delay
+
+
+@lru_cache(maxsize=None)
+def _rate_limited_retry_class() -> type:
+    from urllib3.util.retry import Retry
+
+    class RateLimitedRetry(Retry):
+        rate_limiter: Optional[RateLimiter] = None
+
+        def new(self, **kwargs) -> Retry:
+            retry = super().new(**kwargs)
+            retry.rate_limiter = self.rate_limiter
+            return retry
+
+        def sleep(self, response=None) -> None:
+            # urllib3 retries below HTTPAdapter.send, so each retried attempt takes its own token here.
+            super().sleep(response)
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+
+    return RateLimitedRetry
+
+
+@lru_cache(maxsize=None)
+def _rate_limited_adapter_class() -> type:
+    from requests.adapters import HTTPAdapter
+
+    class RateLimitedAdapter(HTTPAdapter):
+        def __init__(self, rate_limiter: Optional[RateLimiter] = None, **kwargs) -> None:
+            super().__init__(**kwargs)
+            self.rate_limiter = rate_limiter
+
+        @property
+        def rate_limiter(self) -> Optional[RateLimiter]:
+            return self._rate_limiter
+
+        @rate_limiter.setter
+        def rate_limiter(self, rate_limiter: Optional[RateLimiter]) -> None:
+            self._rate_limiter = rate_limiter
+            if isinstance(self.max_retries, _rate_limited_retry_class()):
+                self.max_retries.rate_limiter = rate_limiter
+
+        def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire()
+            return super().send(request, **kwargs)
+
+    return RateLimitedAdapter
+
+
+def create_session(
+    connections_per_host: int = DEFAULT_CONNECTIONS_PER_HOST,
+    retries: int = DEFAULT_RETRIES,
+    backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+    rate_limit: Optional[float] = DEFAULT_RATE_LIMIT,
+) -> requests.Session:
+    import requests
+
+    retry = _rate_limited_retry_class()(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    session = requests.Session()
+    adapter = _rate_limited_adapter_class()(
+        rate_limiter=RateLimiter(rate_limit) if rate_limit else None,
+        pool_connections=connections_per_host,
+        pool_maxsize=connections_per_host,
+        pool_block=True,
+        max_retries=retry,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@lru_cache(maxsize=None)
+def _shared_session() -> requests.Session:
+    return create_session()
+
+
+def _retry_count(response: requests.Response) -> int:
+    retries = getattr(getattr(response, "raw", None), "retries", None)
+    return len(retries.history) if retries is not None else 0
+
+
+class StoredDocument(NamedTuple):
+    path: str
+    sha256: str
+    size: int
+
+    def read_bytes(self) -> bytes:
+        with open(self.path, "rb") as handle:
+            return handle.read()
+
+    @contextmanager
+    def mapped(self) -> Iterator[Union[bytes, mmap.mmap]]:
+        if not self.size:
+            yield b""
+            return
+        with open(self.path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            yield view
+
+
+# Downloads are handed around as paths into the HTTP cache when one is configured, as raw bytes otherwise.
+Document = Union[bytes, StoredDocument]
+
+
+def document_bytes(document: Document) -> bytes:
+    return document.read_bytes() if isinstance(document, StoredDocument) else document
+
+
+def _document_text(document: Document) -> str:
+    if isinstance(document, StoredDocument):
+        with document.mapped() as view:
+            return str(view, "utf-8", "replace")
+    return document.decode("utf-8", errors="replace")
+
+
+def _document_digest(document: Document) -> str:
+    return document.sha256 if isinstance(document, StoredDocument) else hashlib.sha256(document).hexdigest()
+
+
+class HttpCache:
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_CACHE_MAX_BYTES, offline: bool = False) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._index_path = os.path.join(directory, "index.json")
+        self._objects_dir = os.path.join(directory, "objects")
+        self._lock = threading.Lock()
+        os.makedirs(self._objects_dir, exist_ok=True)
+        self._entries: Dict[str, Dict[str, object]] = {}
+        # Objects handed out as paths stay on disk until released, whatever the eviction order says.
+        self._pinned: Dict[str, int] = defaultdict(int)
+        # Hits only refresh access times in memory; the index is written on put, eviction or flush().
+        self._dirty = False
+        if os.path.exists(self._index_path):
+            with open(self._index_path, encoding="utf-8") as handle:
+                self._entries = json.load(handle)
+        self._entries = {
+            url: entry
+            for url, entry in self._entries.items()
+            if os.path.exists(self._object_path(str(entry["sha256"])))
+        }
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self._objects_dir, digest[:2], digest)
+
+    def _save_index(self) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(self._entries, handle)
+        os.replace(tmp_path, self._index_path)
+        self._dirty = False
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(int(entry["size"]) for entry in self._unique_objects().values())
+
+    def _unique_objects(self) -> Dict[str, Dict[str, object]]:
+        return {str(entry["sha256"]): entry for entry in self._entries.values()}
+
+    def validators(self, url: str) -> Dict[str, str]:
+        with self._lock:
+            entry = self._entries.get(url)
+            headers: Dict[str, str] = {}
+            if entry and entry.get("etag"):
+                headers["If-None-Match"] = str(entry["etag"])
+            if entry and entry.get("last_modified"):
+                headers["If-Modified-Since"] = str(entry["last_modified"])
+            return headers
+
+    def get(self, url: str) -> Optional[bytes]:
+        document = self.stored(url)
+        if document is None:
+            return None
+        try:
+            return document.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def stored(self, url: str, pin: bool = False) -> Optional[StoredDocument]:
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            digest = str(entry["sha256"])
+            object_path = self._object_path(digest)
+            if not os.path.exists(object_path):
+                del self._entries[url]
+                self._dirty = True
+                return None
+            entry["accessed"] = time.time()
+            if pin:
+                self._pinned[digest] += 1
+            self._dirty = True
+            return StoredDocument(object_path, digest, int(entry["size"]))
+
+    def put(
+        self,
+        url: str,
+        body: bytes,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        pin: bool = False,
+    ) -> StoredDocument:
+        digest = hashlib.sha256(body).hexdigest()
+        with self._lock:
+            object_path = self._object_path(digest)
+            if not os.path.exists(object_path):
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(object_path), suffix=".tmp")
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(body)
+                os.replace(tmp_path, object_path)
+            self._entries[url] = {
+                "sha256": digest,
+                "size": len(body),
+                "etag": etag,
+                "last_modified": last_modified,
+                "accessed": time.time(),
+            }
+            if pin:
+                self._pinned[digest] += 1
+            self._evict(keep=url)
+            self._save_index()
+            return StoredDocument(object_path, digest, len(body))
+
+    def release(self, document: Optional[Document]) -> None:
+        if not isinstance(document, StoredDocument):
+            return
+        with self._lock:
+            self._pinned[document.sha256] -= 1
+            if self._pinned[document.sha256] <= 0:
+                del self._pinned[document.sha256]
+                self._evict(keep="")
+                self._save_index()
+
+    def _evict(self, keep: str) -> None:
+        objects = self._unique_objects()
+        total = sum(int(entry["size"]) for entry in objects.values())
+        for url in sorted(self._entries, key=lambda key: float(self._entries[key]["accessed"])):
+            if total <= self.max_bytes:
+                break
+            if url == keep or self._entries[url]["sha256"] in self._pinned:
+                continue
+            digest = str(self._entries.pop(url)["sha256"])
+            if any(entry["sha256"] == digest for entry in self._entries.values()):
+                continue
+            total -= int(objects[digest]["size"])
+            try:
+                os.remove(self._object_path(digest))
+            except FileNotFoundError:
+                pass
+
+
+def fetch_document(
+    session: Optional[requests.Session],
+    url: str,
+    cache: Optional[HttpCache] = None,
+    metrics: Optional[RunMetrics] = None,
+) -> bytes:
+    return document_bytes(fetch_stored_document(session, url, cache, metrics))
+
+
+def fetch_stored_document(
+    session: Optional[requests.Session],
+    url: str,
+    cache: Optional[HttpCache] = None,
+    metrics: Optional[RunMetrics] = None,
+    pin: bool = False,
+) -> Document:
+    metrics = metrics or RunMetrics()
+    if cache is not None and cache.offline:
+        stored = cache.stored(url, pin)
+        if stored is None:
+            raise RuntimeError(f"{url} is not available in the offline cache.")
+        metrics.increment("http_cache_hits")
+        return stored
+    session = session or _shared_session()
+    headers = cache.validators(url) if cache is not None else {}
+    response = session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
+    metrics.increment("http_requests")
+    metrics.increment("http_retries", _retry_count(response))
+    if cache is not None and response.status_code == 304:
+        stored = cache.stored(url, pin)
+        if stored is not None:
+            metrics.increment("http_cache_hits")
+            return stored
+        response = session.get(url, timeout=REQUEST_TIMEOUT)
+        metrics.increment("http_requests")
+        metrics.increment("http_retries", _retry_count(response))
     response.raise_for_status()
-    soup = BeautifulSoup(response.text, "lxml")
-    tables = soup.find_all("table", attrs={"aria-label": re.compile(r"Quarter", re.I)})
+    metrics.increment("http_bytes_downloaded", len(response.content))
+    if cache is not None:
+        return cache.put(
+            url, response.content, response.headers.get("ETag"), response.headers.get("Last-Modified"), pin
+        )
+    return response.content
+
+
+def _timed_fetch(
+    session: Optional[requests.Session],
+    url: str,
+    cache: Optional[HttpCache],
+    metrics: RunMetrics,
+    stage: str,
+    quarter_label: str,
+) -> Document:
+    with metrics.stage(stage, quarter_label):
+        # Pinned until the quarter finishes, because the parse pool may open the object file much later.
+        return fetch_stored_document(session, url, cache, metrics, pin=True)
+
+
+def extract_quarter_links(
+    page_url: str,
+    session: Optional[requests.Session] = None,
+    cache: Optional[HttpCache] = None,
+    metrics: Optional[RunMetrics] = None,
+) -> Dict[Tuple[int, int], str]:
+    metrics = metrics or RunMetrics()
+    with metrics.stage("index_page_download"):
+        document = fetch_document(session, page_url, cache, metrics)
+    with metrics.stage("index_page_parse"):
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(document, "lxml", parse_only=_quarter_table_strainer())
+        return _parse_quarter_links(soup)
+
+
+def _parse_quarter_links(soup: BeautifulSoup) -> Dict[Tuple[int, int], str]:
+    tables = soup.find_all("table", attrs={"aria-label": _QUARTER_TABLE_LABEL})
     if not tables:
         raise RuntimeError("Could not locate the quarter link table on the page.")
     links: Dict[Tuple[int, int], str] = {}
@@ -52,22 +770,30 @@ def extract_quarter_links(page_url: str) -> Dict[Tuple[int, int], str]:
         table_links = _parse_quarter_link_table(table)
         for key, url in table_links.items():
             links[key] = url
-
     return links
 
 
-def extract_official_links() -> Dict[Tuple[int, int], str]:
-    return extract_quarter_links(OFFICIAL_REMARKS_URL)
+def extract_official_links(
+    session: Optional[requests.Session] = None,
+    cache: Optional[HttpCache] = None,
+    metrics: Optional[RunMetrics] = None,
+) -> Dict[Tuple[int, int], str]:
+    return extract_quarter_links(OFFICIAL_REMARKS_URL, session, cache, metrics)
 
 
-def extract_recommended_links() -> Dict[Tuple[int, int], str]:
-    return extract_quarter_links(RECOMMENDED_TABLES_URL)
+def extract_recommended_links(
+    session: Optional[requests.Session] = None,
+    cache: Optional[HttpCache] = None,
+    metrics: Optional[RunMetrics] = None,
+) -> Dict[Tuple[int, int], str]:
+    return extract_quarter_links(RECOMMENDED_TABLES_URL, session, cache, metrics)
 
 
+@lru_cache(maxsize=CLASSIFICATION_CACHE_SIZE)
 def _quarter_from_label(text: str) -> Optional[int]:
     if not text:
         return None
-    match = re.search(r"Q([1-4])\b", text, re.IGNORECASE)
+    match = _QUARTER_PATTERN.search(text)
     if match:
         return int(match.group(1))
     value = ordinal_to_int(text)
@@ -105,7 +831,7 @@ def _parse_quarter_link_table(table: Tag) -> Dict[Tuple[int, int], str]:
     for row in rows:
         header_cells = row.find_all("th")
         for cell in header_cells:
-            year_match = re.search(r"(19|20)\d{2}", cell.get_text())
+            year_match = _YEAR_PATTERN.search(cell.get_text())
             if year_match:
                 current_year = int(year_match.group(0))
                 break
@@ -149,82 +875,94 @@ def _parse_quarter_link_table(table: Tag) -> Dict[Tuple[int, int], str]:
     return links
 
 
-def parse_maturity(security: str) -> Tuple[Optional[float], str]:
-    maturity_match = re.search(r"(\d+)(?:\s*-?\s*)(Year|Month|Week|Day)", security, re.IGNORECASE)
+# Cell index of each security in the TBAC recommended-financing matrix table.
+MATRIX_TABLE_COLUMNS = {
+    5: ("2-Year Note", SecurityType.NOTE, 2.0),
+    8: ("3-Year Note", SecurityType.NOTE, 3.0),
+    11: ("5-Year Note", SecurityType.NOTE, 5.0),
+    14: ("7-Year Note", SecurityType.NOTE, 7.0),
+    17: ("10-Year Note", SecurityType.NOTE, 10.0),
+    20: ("20-Year Bond", SecurityType.BOND, 20.0),
+    23: ("30-Year Bond", SecurityType.BOND, 30.0),
+    26: ("5-Year TIPS", SecurityType.TIPS, 5.0),
+    29: ("10-Year TIPS", SecurityType.TIPS, 10.0),
+    32: ("30-Year TIPS", SecurityType.TIPS, 30.0),
+    35: ("2-Year FRN", SecurityType.FRN, 2.0),
+}
+
+_MATURITY_UNITS = {
+    "YEAR": Units.YEARS,
+    "MONTH": Units.MONTHS,
+    "WEEK": Units.WEEKS,
+    "DAY": Units.DAYS,
+}
+# Keyword precedence when a label mentions several security kinds, e.g. "TIPS bill".
+_SECURITY_PRECEDENCE = (
+    ("bill", SecurityType.BILL),
+    ("tips", SecurityType.TIPS),
+    ("frn", SecurityType.FRN),
+    ("bond", SecurityType.BOND),
+    ("note", SecurityType.NOTE),
+    ("savings", SecurityType.SAVINGS),
+)
+
+
+@lru_cache(maxsize=CLASSIFICATION_CACHE_SIZE)
+def parse_maturity(security: str) -> Tuple[Optional[float], Units]:
+    maturity_match = _MATURITY_PATTERN.search(security)
     if maturity_match:
-        maturity = float(maturity_match.group(1))
-        unit_text = maturity_match.group(2).upper()
-        if "YEAR" in unit_text:
-            unit = "YEARS"
-        elif "MONTH" in unit_text:
-            unit = "MONTHS"
-        elif "WEEK" in unit_text:
-            unit = "WEEKS"
-        else:
-            unit = "DAYS"
-        return maturity, unit
-    return None, ""
-
-
-def categorize_security(security: str) -> str:
-    s_lower = security.lower()
-    if "bill" in s_lower:
-        return "BILL"
-    if "tips" in s_lower:
-        return "TIPS"
-    if "frn" in s_lower:
-        return "FRN"
-    if "bond" in s_lower:
-        return "BOND"
-    if "note" in s_lower:
-        return "NOTE"
-    if "savings" in s_lower:
-        return "SAVINGS"
-    return "OTHER"
-
-
-def parse_recommended_pdf(pdf_bytes: bytes, quarter: int, year: int, announcement_date: str) -> List[Dict[str, object]]:
-    results: List[Dict[str, object]] = []
-    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-        pages = list(pdf.pages)
+        return float(maturity_match.group(1)), _MATURITY_UNITS[maturity_match.group(2).upper()]
+    return None, Units.NONE
+
+
+@lru_cache(maxsize=CLASSIFICATION_CACHE_SIZE)
+def categorize_security(security: str) -> SecurityType:
+    # Six substring checks on the lowered label beat a case-insensitive alternation scan.
+    lowered = security.lower()
+    for keyword, security_type in _SECURITY_PRECEDENCE:
+        if keyword in lowered:
+            return security_type
+    return SecurityType.OTHER
+
+
+def parse_recommended_pdf(
+    pdf_document: Document, quarter: int, year: int, announcement_date: str
+) -> List[RefundingRow]:
+    import pdfplumber
+
+    results: List[RefundingRow] = []
+    page_texts: List[str] = []
+    source = pdf_document.path if isinstance(pdf_document, StoredDocument) else io.BytesIO(pdf_document)
+    with pdfplumber.open(source) as pdf:
         matrix_entries = _parse_matrix_recommended_pages(
-            pages, format_quarter(year, quarter), announcement_date
+            _recommendation_pages(pdf.pages, page_texts), format_quarter(year, quarter), announcement_date
         )
         if matrix_entries:
             results.extend(matrix_entries)
             return results
-        text = "\n".join(page.extract_text(layout=True) or "" for page in pages)
+    text = "\n".join(page_texts)
 
     lines = [line.strip() for line in text.splitlines() if line.strip()]
-    pattern = re.compile(
-        r"^(?P<security>[A-Za-z0-9/\-\(\)\s]+?)\s+"
-        r"(?P<date>\d{1,2}/\d{1,2})\s+"
-        r"(?P<offered>\d+\.\d{2})\s+"
-        r"(?P<maturing>\d+\.\d{2})"
-        r"(?:\s+(?P<new_money>\d+\.\d{2}))?"
-        r"(?:\s+(?P<change>\d+\.\d{2}))?"
-        r"$"
-    )
     quarter_label = format_quarter(year, quarter)
     for line in lines:
         if line.lower().startswith("net bills issuance"):
             amount = float(line.split()[-1])
             results.append(
-                {
-                    "Quarter_year": quarter_label,
-                    "Date": announcement_date,
-                    "Security_type": "BILL",
-                    "Maturity": "",
-                    "Units": "",
-                    "Auction_month": "",
-                    "Auction_date": "",
-                    "Offered_amount": amount,
-                    "Data_type": "RECOMMENDATION_FOR_THIS_REFUNDING",
-                    "Notes": "Net bills issuance for the quarter (recommended table)",
-                }
+                RefundingRow(
+                    Quarter_year=quarter_label,
+                    Date=announcement_date,
+                    Security_type=SecurityType.BILL,
+                    Maturity=None,
+                    Units=Units.NONE,
+                    Auction_month="",
+                    Auction_date="",
+                    Offered_amount=amount,
+                    Data_type=DataType.RECOMMENDATION_FOR_THIS_REFUNDING,
+                    Notes=NOTE_NET_BILLS,
+                )
             )
             continue
-        match = pattern.match(line)
+        match = _RECOMMENDED_LINE_PATTERN.match(line)
         if not match:
             continue
         data = match.groupdict()
@@ -235,40 +973,57 @@ def parse_recommended_pdf(pdf_bytes: bytes, quarter: int, year: int, announcemen
         month, day = map(int, data["date"].split("/"))
         year_for_date = year
         auction_date = datetime(year_for_date, month, day)
-        entry = {
-            "Quarter_year": quarter_label,
-            "Date": announcement_date,
-            "Security_type": categorize_security(security_clean),
-            "Maturity": maturity_value if maturity_value is not None else "",
-            "Units": unit,
-            "Auction_month": auction_date.strftime("%Y-%m"),
-            "Auction_date": auction_date.strftime("%Y-%m-%d"),
-            "Offered_amount": offered_amount,
-            "Data_type": "RECOMMENDATION_FOR_THIS_REFUNDING",
-            "Notes": "Reopening" if "(r)" in security else "Recommended financing schedule",
-        }
+        entry = RefundingRow(
+            Quarter_year=quarter_label,
+            Date=announcement_date,
+            Security_type=categorize_security(security_clean),
+            Maturity=maturity_value,
+            Units=unit,
+            Auction_month=auction_date.strftime("%Y-%m"),
+            Auction_date=auction_date.strftime("%Y-%m-%d"),
+            Offered_amount=offered_amount,
+            Data_type=DataType.RECOMMENDATION_FOR_THIS_REFUNDING,
+            Notes=NOTE_REOPENING if "(r)" in security else NOTE_RECOMMENDED_SCHEDULE,
+        )
         results.append(entry)
     return results
 
 
+def recommended_parser_path(entries: Iterable[RefundingRow]) -> str:
+    notes = {entry.Notes for entry in entries}
+    if not notes:
+        return "none"
+    return "matrix" if NOTE_MATRIX_TABLE in notes else "regex_fallback"
+
+
+def _has_section_marker(text: str) -> bool:
+    return ("Provisional" in text and "Next Refunding" in text) or ("Historical" in text and "Reference" in text)
+
+
+def _recommendation_pages(
+    pages: Iterable[pdfplumber.page.Page], page_texts: List[str]
+) -> Iterable[pdfplumber.page.Page]:
+    # Plain text is enough to find the section markers and feeds the regex fallback
+    # as well, so every page is read once, without the costlier layout rendering,
+    # and only pages belonging to the recommendations section go through table extraction.
+    in_section = False
+    for page in pages:
+        text = page.extract_text() or ""
+        page_texts.append(text)
+        if "Recommendations" in text and "Refunding" in text:
+            in_section = True
+        elif _has_section_marker(text):
+            in_section = False
+        if in_section:
+            yield page
+        page.close()
+
+
 def _parse_matrix_recommended_pages(
-    pages: List[pdfplumber.page.Page], quarter_label: str, announcement_date: str
-) -> List[Dict[str, object]]:
-    column_map = {
-        5: ("2-Year Note", "NOTE", 2.0),
-        8: ("3-Year Note", "NOTE", 3.0),
-        11: ("5-Year Note", "NOTE", 5.0),
-        14: ("7-Year Note", "NOTE", 7.0),
-        17: ("10-Year Note", "NOTE", 10.0),
-        20: ("20-Year Bond", "BOND", 20.0),
-        23: ("30-Year Bond", "BOND", 30.0),
-        26: ("5-Year TIPS", "TIPS", 5.0),
-        29: ("10-Year TIPS", "TIPS", 10.0),
-        32: ("30-Year TIPS", "TIPS", 30.0),
-        35: ("2-Year FRN", "FRN", 2.0),
-    }
-    entries: List[Dict[str, object]] = []
-    section: Optional[str] = None
+    pages: Iterable[pdfplumber.page.Page], quarter_label: str, announcement_date: str
+) -> List[RefundingRow]:
+    entries: List[RefundingRow] = []
+    section: Optional[DataType] = None
     for page in pages:
         for table in page.extract_tables() or []:
             for raw_row in table:
@@ -277,56 +1032,67 @@ def _parse_matrix_recommended_pages(
                     continue
                 joined = " ".join(row)
                 if "Recommendations" in joined and "Refunding" in joined:
-                    section = "RECOMMENDATION_FOR_THIS_REFUNDING"
+                    section = DataType.RECOMMENDATION_FOR_THIS_REFUNDING
                     continue
                 if "Provisional" in joined and "Next Refunding" in joined:
-                    section = "INDICATIONS_FOR_NEXT_REFUNDING"
+                    section = DataType.INDICATIONS_FOR_NEXT_REFUNDING
                     continue
                 if "Historical" in joined and "Reference" in joined:
-                    section = "HISTORICAL_REFERENCE"
+                    section = DataType.HISTORICAL_REFERENCE
                     continue
                 month = next(
-                    (value for value in row if value and re.match(r"[A-Za-z]{3}-\d{2}$", value)),
+                    (value for value in row if value and _MONTH_CELL_PATTERN.match(value)),
                     None,
                 )
-                if not month or section != "RECOMMENDATION_FOR_THIS_REFUNDING":
+                if not month or section is not DataType.RECOMMENDATION_FOR_THIS_REFUNDING:
                     continue
                 month_date = datetime.strptime(month, "%b-%y")
                 auction_month = month_date.strftime("%Y-%m")
-                for idx, (name, security_type, maturity) in column_map.items():
+                for idx, (name, security_type, maturity) in MATRIX_TABLE_COLUMNS.items():
                     if idx >= len(row):
                         continue
                     value = row[idx]
-                    if not value or not re.match(r"^\d+(?:\.\d+)?$", value):
+                    if not value or not _AMOUNT_CELL_PATTERN.match(value):
                         continue
                     amount = float(value)
                     entries.append(
-                        {
-                            "Quarter_year": quarter_label,
-                            "Date": announcement_date,
-                            "Security_type": security_type,
-                            "Maturity": maturity,
-                            "Units": "YEARS",
-                            "Auction_month": auction_month,
-                            "Auction_date": "",
-                            "Offered_amount": amount,
-                            "Data_type": "RECOMMENDATION_FOR_THIS_REFUNDING",
-                            "Notes": "TBAC recommended financing table (matrix format)",
-                        }
+                        RefundingRow(
+                            Quarter_year=quarter_label,
+                            Date=announcement_date,
+                            Security_type=security_type,
+                            Maturity=maturity,
+                            Units=Units.YEARS,
+                            Auction_month=auction_month,
+                            Auction_date="",
+                            Offered_amount=amount,
+                            Data_type=DataType.RECOMMENDATION_FOR_THIS_REFUNDING,
+                            Notes=NOTE_MATRIX_TABLE,
+                        )
                     )
     return entries
 
 
-def parse_official_article(article_html: str, year: int, quarter: int) -> Tuple[str, List[Dict[str, object]]]:
-    soup = BeautifulSoup(article_html, "lxml")
+def parse_official_article(
+    article_html: Union[str, Document], year: int, quarter: int
+) -> Tuple[str, List[RefundingRow]]:
+    from bs4 import BeautifulSoup
+
+    if not isinstance(article_html, str):
+        article_html = _document_text(article_html)
+    soup = BeautifulSoup(article_html, "lxml", parse_only=_official_article_strainer())
+    return _parse_official_soup(soup, year, quarter)
+
+
+def _parse_official_soup(soup: BeautifulSoup, year: int, quarter: int) -> Tuple[str, List[RefundingRow]]:
     date_element = soup.select_one("div.field--name-field-news-publication-date time")
     if not date_element or not date_element.has_attr("datetime"):
         raise RuntimeError("Announcement date not found in official remarks article.")
     announcement_date = datetime.fromisoformat(date_element["datetime"].replace("Z", "+00:00")).date()
+    announcement_text = announcement_date.strftime("%Y-%m-%d")
     quarter_label = format_quarter(year, quarter)
 
     table = soup.select_one("div.field--name-field-news-body table")
-    table_entries: List[Dict[str, object]] = []
+    table_entries: List[RefundingRow] = []
     if table and table.find("thead") and table.find("tbody"):
         headers = [cell.get_text(strip=True) for cell in table.find("thead").find_all("th")][1:]
         for row in table.find("tbody").find_all("tr"):
@@ -352,103 +1118,1375 @@ def parse_official_article(article_html: str, year: int, quarter: int) -> Tuple[
                 is_projection = is_projection_row or bool(cell.find("strong"))
                 maturity_value, unit = parse_maturity(header)
                 security_type = categorize_security(header)
-                if security_type == "OTHER" and "year" in header.lower():
+                if security_type is SecurityType.OTHER and "year" in header.lower():
                     if maturity_value is not None and maturity_value >= 20:
-                        security_type = "BOND"
+                        security_type = SecurityType.BOND
                     else:
-                        security_type = "NOTE"
-                note = (
-                    "Projected auction size from official remarks table"
-                    if is_projection
-                    else "Actual auction size from prior quarter"
-                )
+                        security_type = SecurityType.NOTE
                 table_entries.append(
-                    {
-                        "Quarter_year": quarter_label,
-                        "Date": announcement_date.strftime("%Y-%m-%d"),
-                        "Security_type": security_type,
-                        "Maturity": maturity_value if maturity_value is not None else "",
-                        "Units": unit,
-                        "Auction_month": auction_month,
-                        "Auction_date": "",
-                        "Offered_amount": amount,
-                        "Data_type": "INDICATIONS_FOR_NEXT_REFUNDING"
+                    RefundingRow(
+                        Quarter_year=quarter_label,
+                        Date=announcement_text,
+                        Security_type=security_type,
+                        Maturity=maturity_value,
+                        Units=unit,
+                        Auction_month=auction_month,
+                        Auction_date="",
+                        Offered_amount=amount,
+                        Data_type=DataType.INDICATIONS_FOR_NEXT_REFUNDING
                         if is_projection
-                        else "HISTORICAL_REFERENCE",
-                        "Notes": note,
-                    }
+                        else DataType.HISTORICAL_REFERENCE,
+                        Notes=NOTE_PROJECTED if is_projection else NOTE_ACTUAL,
+                    )
                 )
-    return announcement_date.strftime("%Y-%m-%d"), table_entries
+    return announcement_text, table_entries
 
 
-def collect_data(max_quarters: int = DEFAULT_MAX_QUARTERS) -> List[Dict[str, object]]:
-    official_links = extract_official_links()
-    recommended_links = extract_recommended_links()
-    available_quarters = sorted(
-        set(official_links.keys()) & set(recommended_links.keys()),
-        reverse=True,
-    )
-    selected_quarters = available_quarters[:max_quarters]
-    session = requests.Session()
-    all_entries: List[Dict[str, object]] = []
-    for year, quarter in selected_quarters:
-        quarter_label = format_quarter(year, quarter)
-        print(f"Fetching data for {quarter_label}...")
-        official_url = official_links[(year, quarter)]
-        recommended_url = recommended_links[(year, quarter)]
-        official_resp = session.get(official_url, timeout=60)
-        official_resp.raise_for_status()
-        announcement_date, table_entries = parse_official_article(official_resp.text, year, quarter)
-        all_entries.extend(table_entries)
-
-        recommended_resp = session.get(recommended_url, timeout=60)
-        recommended_resp.raise_for_status()
-        pdf_entries = parse_recommended_pdf(recommended_resp.content, quarter, year, announcement_date)
-        all_entries.extend(pdf_entries)
-    return all_entries
-
-
-def write_csv(entries: Iterable[Dict[str, object]], path: str) -> None:
-    fieldnames = [
-        "Quarter_year",
-        "Date",
-        "Security_type",
-        "Maturity",
-        "Units",
-        "Auction_month",
-        "Auction_date",
-        "Offered_amount",
-        "Data_type",
-        "Notes",
+PARSER_ENTRY_POINTS = ("parse_official_article", "parse_recommended_pdf")
+
+
+def _global_names(code: types.CodeType) -> Iterator[str]:
+    yield from code.co_names
+    for constant in code.co_consts:
+        if isinstance(constant, types.CodeType):
+            yield from _global_names(constant)
+
+
+def _parser_sources() -> Dict[str, str]:
+    import inspect
+
+    # Follows the globals the parser entry points reach, so their helpers, patterns and constants are covered
+    # while fetching, output and CLI code can change without invalidating cached parses and checkpoints.
+    namespace = globals()
+    sources: Dict[str, str] = {}
+    pending = list(PARSER_ENTRY_POINTS)
+    while pending:
+        name = pending.pop()
+        if name in sources or name not in namespace or name.startswith("__"):
+            continue
+        value = namespace[name]
+        value = getattr(value, "__wrapped__", value)
+        if inspect.isfunction(value) or inspect.isclass(value):
+            if value.__module__ != __name__:
+                continue
+            sources[name] = inspect.getsource(value)
+            functions = [value] if inspect.isfunction(value) else [
+                member for member in vars(value).values() if inspect.isfunction(member)
+            ]
+            for function in functions:
+                pending.extend(_global_names(function.__code__))
+        elif isinstance(value, (str, int, float, tuple, frozenset, dict, re.Pattern)):
+            sources[name] = repr(value)
+    return sources
+
+
+@lru_cache(maxsize=None)
+def parser_fingerprint() -> str:
+    digest = hashlib.sha256(f"parser-version:{PARSER_VERSION}".encode("utf-8"))
+    try:
+        sources = _parser_sources()
+    except (OSError, TypeError):
+        # Without inspectable parser source, hashing the whole file over-invalidates but never serves stale parses.
+        try:
+            with open(__file__, encoding="utf-8") as handle:
+                sources = {"": handle.read()}
+        except OSError:
+            sources = {}
+    for name, source in sorted(sources.items()):
+        digest.update(f"\0{name}\0{source}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ParseCache:
+    def __init__(self, path: str, fingerprint: Optional[str] = None) -> None:
+        import sqlite3
+
+        self.path = path
+        self.fingerprint = fingerprint or parser_fingerprint()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS parsed_results ("
+                "key TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, result TEXT NOT NULL)"
+            )
+            self._connection.execute("DELETE FROM parsed_results WHERE fingerprint != ?", (self.fingerprint,))
+
+    def key(self, parser_name: str, document: Document, *params: object) -> str:
+        material = json.dumps([parser_name, _document_digest(document), list(params), self.fingerprint])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[object]:
+        with self._lock:
+            row = self._connection.execute("SELECT result FROM parsed_results WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key: str, result: object) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO parsed_results (key, fingerprint, result) VALUES (?, ?, ?)",
+                (key, self.fingerprint, json.dumps(result)),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class Checkpoint:
+    def __init__(self, directory: str, resume: bool = False, fingerprint: Optional[str] = None) -> None:
+        self.directory = directory
+        self.fingerprint = fingerprint or parser_fingerprint()
+        self.manifest_path = os.path.join(directory, CHECKPOINT_MANIFEST)
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.quarters: Dict[str, Dict[str, object]] = {}
+        previous = self._load_manifest()
+        if resume and previous.get("fingerprint") == self.fingerprint:
+            self.quarters = previous.get("quarters", {})
+        else:
+            for status in previous.get("quarters", {}).values():
+                stale = os.path.join(directory, str(status.get("file", "")))
+                if status.get("file") and os.path.exists(stale):
+                    os.unlink(stale)
+            self._write_manifest()
+
+    def _load_manifest(self) -> Dict[str, object]:
+        try:
+            with open(self.manifest_path, encoding="utf-8") as handle:
+                manifest = json.load(handle)
+        except (OSError, ValueError):
+            return {}
+        return manifest if isinstance(manifest, dict) else {}
+
+    def _write_manifest(self) -> None:
+        with _atomic_output(self.manifest_path) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                manifest = {"fingerprint": self.fingerprint, "quarters": self.quarters}
+                json.dump(manifest, handle, indent=2, sort_keys=True)
+
+    def _rows_path(self, quarter_label: str) -> str:
+        return os.path.join(self.directory, f"{quarter_label.replace(' ', '_')}.csv")
+
+    def completed(self) -> Set[str]:
+        with self._lock:
+            return {
+                label
+                for label, status in self.quarters.items()
+                if status.get("status") == "complete" and os.path.exists(self._rows_path(label))
+            }
+
+    def rows(self, quarter_label: str) -> List[RefundingRow]:
+        return read_csv(self._rows_path(quarter_label))
+
+    def mark_complete(self, quarter_label: str, rows: List[RefundingRow]) -> None:
+        path = self._rows_path(quarter_label)
+        count = write_csv(rows, path)
+        with self._lock:
+            self.quarters[quarter_label] = {
+                "status": "complete",
+                "rows": count,
+                "file": os.path.basename(path),
+                "updated": datetime.now().isoformat(timespec="seconds"),
+            }
+            self._write_manifest()
+
+    def mark_failed(self, quarter_label: str, error: BaseException) -> None:
+        with self._lock:
+            self.quarters[quarter_label] = {
+                "status": "failed",
+                "error": f"{type(error).__name__}: {error}",
+                "updated": datetime.now().isoformat(timespec="seconds"),
+            }
+            self._write_manifest()
+
+
+class _QuarterJob(NamedTuple):
+    quarter_label: str
+    table_entries: List[RefundingRow]
+    pdf_job: Future
+    pdf_key: Optional[str]
+    resumed: bool = False
+    downloads: Tuple[Future, ...] = ()
+
+
+def _timed_parse_recommended(
+    pdf_document: Document, quarter: int, year: int, announcement_date: str
+) -> Tuple[List[RefundingRow], float]:
+    start = time.perf_counter()
+    entries = parse_recommended_pdf(pdf_document, quarter, year, announcement_date)
+    return entries, time.perf_counter() - start
+
+
+def _parse_official_cached(
+    document: Document, year: int, quarter: int, parse_cache: Optional[ParseCache], metrics: RunMetrics
+) -> Tuple[str, List[RefundingRow]]:
+    quarter_label = format_quarter(year, quarter)
+    key = parse_cache.key("official", document, year, quarter) if parse_cache is not None else None
+    if key is not None:
+        cached = parse_cache.get(key)
+        if cached is not None:
+            metrics.increment("parse_cache_hits", quarter=quarter_label)
+            return cached["date"], [RefundingRow.from_values(values) for values in cached["entries"]]
+    with metrics.stage("official_parse", quarter_label, profile=True):
+        announcement_date, entries = parse_official_article(document, year, quarter)
+    if key is not None:
+        parse_cache.put(key, {"date": announcement_date, "entries": entries})
+    return announcement_date, entries
+
+
+def _parse_quarter_documents(
+    year: int,
+    quarter: int,
+    official_future: Future,
+    recommended_future: Future,
+    parse_pool: Optional[ProcessPoolExecutor],
+    parse_cache: Optional[ParseCache],
+    metrics: RunMetrics,
+) -> _QuarterJob:
+    quarter_label = format_quarter(year, quarter)
+    official_document = official_future.result()
+    announcement_date, table_entries = "", []
+    if official_document is not None:
+        announcement_date, table_entries = _parse_official_cached(
+            official_document, year, quarter, parse_cache, metrics
+        )
+    pdf_document = recommended_future.result()
+    if pdf_document is None:
+        return _QuarterJob(quarter_label, table_entries, _completed_future(([], None)), None)
+    pdf_key = None
+    cached_entries = None
+    if parse_cache is not None:
+        pdf_key = parse_cache.key("recommended", pdf_document, year, quarter, announcement_date)
+        cached_entries = parse_cache.get(pdf_key)
+    if cached_entries is not None:
+        metrics.increment("parse_cache_hits", quarter=quarter_label)
+        pdf_job = _completed_future(([RefundingRow.from_values(values) for values in cached_entries], None))
+        return _QuarterJob(quarter_label, table_entries, pdf_job, None)
+    if parse_pool is None:
+        pdf_job: Future = Future()
+        # The parse is timed by _timed_parse_recommended and recorded once, by _finish_quarter.
+        with metrics.profiled():
+            pdf_job.set_result(_timed_parse_recommended(pdf_document, quarter, year, announcement_date))
+    else:
+        # Cached documents travel to the workers as paths, so only a few bytes are pickled per quarter.
+        pdf_job = parse_pool.submit(_timed_parse_recommended, pdf_document, quarter, year, announcement_date)
+    return _QuarterJob(quarter_label, table_entries, pdf_job, pdf_key)
+
+
+def _release_downloads(cache: Optional[HttpCache], downloads: Iterable[Optional[Future]]) -> None:
+    if cache is None:
+        return
+    for future in downloads:
+        if future is not None and future.done() and not future.cancelled() and future.exception() is None:
+            cache.release(future.result())
+
+
+def _completed_future(result: object) -> Future:
+    future: Future = Future()
+    future.set_result(result)
+    return future
+
+
+def _resumed_quarter(quarter_label: str, checkpoint: Checkpoint) -> _QuarterJob:
+    return _QuarterJob(quarter_label, checkpoint.rows(quarter_label), _completed_future(([], None)), None, resumed=True)
+
+
+def _finish_quarter(
+    job: _QuarterJob,
+    parse_cache: Optional[ParseCache],
+    metrics: RunMetrics,
+    checkpoint: Optional[Checkpoint] = None,
+) -> List[RefundingRow]:
+    if job.resumed:
+        metrics.increment("quarters_resumed", quarter=job.quarter_label)
+        return job.table_entries
+    pdf_entries, parse_seconds = job.pdf_job.result()
+    if parse_seconds is not None:
+        metrics.record("recommended_parse", parse_seconds, job.quarter_label)
+    if job.pdf_key is not None:
+        parse_cache.put(job.pdf_key, pdf_entries)
+    parser_path = recommended_parser_path(pdf_entries)
+    metrics.increment("rows_official", len(job.table_entries), quarter=job.quarter_label)
+    metrics.increment(f"rows_{parser_path}", len(pdf_entries), quarter=job.quarter_label)
+    metrics.increment(f"quarters_{parser_path}", quarter=job.quarter_label)
+    entries = job.table_entries + pdf_entries
+    if checkpoint is not None:
+        checkpoint.mark_complete(job.quarter_label, entries)
+    return entries
+
+
+def _select_quarters(
+    official_links: Dict[Tuple[int, int], str],
+    recommended_links: Dict[Tuple[int, int], str],
+    max_quarters: Optional[int],
+    first_year: Optional[int],
+    last_year: Optional[int],
+    archive: bool,
+) -> List[Tuple[int, int]]:
+    # Archive runs keep quarters that have only one of the two documents; regular runs need both.
+    if archive:
+        available = set(official_links) | set(recommended_links)
+    else:
+        available = set(official_links) & set(recommended_links)
+    in_range = [
+        key
+        for key in sorted(available, reverse=True)
+        if (first_year is None or key[0] >= first_year) and (last_year is None or key[0] <= last_year)
     ]
-    with open(path, "w", newline="", encoding="utf-8") as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
+    return in_range if max_quarters is None else in_range[:max_quarters]
+
+
+def _fetch_optional(
+    executor: ThreadPoolExecutor,
+    session: Optional[requests.Session],
+    url: Optional[str],
+    cache: Optional[HttpCache],
+    metrics: RunMetrics,
+    stage: str,
+    quarter_label: str,
+) -> Future:
+    if url is None:
+        metrics.increment("documents_missing", quarter=quarter_label)
+        return _completed_future(None)
+    return executor.submit(_timed_fetch, session, url, cache, metrics, stage, quarter_label)
+
+
+def iter_collected_entries(
+    max_quarters: Optional[int] = DEFAULT_MAX_QUARTERS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    session: Optional[requests.Session] = None,
+    cache: Optional[HttpCache] = None,
+    skip_quarters: Optional[Set[Tuple[int, int]]] = None,
+    parse_workers: Optional[int] = None,
+    parse_cache: Optional[ParseCache] = None,
+    metrics: Optional[RunMetrics] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    first_year: Optional[int] = None,
+    last_year: Optional[int] = None,
+    archive: bool = False,
+    quarter_links: Optional[Tuple[QuarterLinks, QuarterLinks]] = None,
+) -> Iterator[RefundingRow]:
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if first_year is not None and last_year is not None and first_year > last_year:
+        raise ValueError("first_year must not be after last_year")
+    if parse_workers is None:
+        parse_workers = os.cpu_count() or 1
+    metrics = metrics or RunMetrics()
+    if metrics.profiler is not None:
+        # cProfile only sees this process, so profiled runs parse PDFs inline.
+        parse_workers = 1
+    session = session or create_session()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        if quarter_links is None:
+            official_links_future = executor.submit(extract_official_links, session, cache, metrics)
+            recommended_links_future = executor.submit(extract_recommended_links, session, cache, metrics)
+            official_links = official_links_future.result()
+            recommended_links = recommended_links_future.result()
+        else:
+            official_links, recommended_links = quarter_links
+        selected_quarters = [
+            key
+            for key in _select_quarters(official_links, recommended_links, max_quarters, first_year, last_year, archive)
+            if not skip_quarters or key not in skip_quarters
+        ]
+        metrics.increment("quarters_selected", len(selected_quarters))
+        resumed = checkpoint.completed() if checkpoint is not None else set()
+        pending = [key for key in selected_quarters if format_quarter(*key) not in resumed]
+
+        # Only a bounded window of quarters is in flight at once: downloads run ahead
+        # of parsing, PDF parsing runs on a process pool, and finished quarters are
+        # yielded in order so rows stay deterministic and memory stays flat.
+        parse_pool = None
+        if parse_workers > 1 and pending:
+            from concurrent.futures import ProcessPoolExecutor
+
+            parse_pool = ProcessPoolExecutor(max_workers=parse_workers)
+        window = 2 * max(concurrency, parse_workers)
+        remaining = iter(selected_quarters)
+        downloads: Deque[Tuple[int, int, Future, Future]] = deque()
+        parsed: Deque[_QuarterJob] = deque()
+        try:
+            while True:
+                while len(downloads) + len(parsed) < window:
+                    next_quarter = next(remaining, None)
+                    if next_quarter is None:
+                        break
+                    year, quarter = next_quarter
+                    quarter_label = format_quarter(year, quarter)
+                    if quarter_label in resumed:
+                        downloads.append((year, quarter, None, None))
+                        continue
+                    official_future = _fetch_optional(
+                        executor,
+                        session,
+                        official_links.get(next_quarter),
+                        cache,
+                        metrics,
+                        "official_download",
+                        quarter_label,
+                    )
+                    recommended_future = _fetch_optional(
+                        executor,
+                        session,
+                        recommended_links.get(next_quarter),
+                        cache,
+                        metrics,
+                        "recommended_download",
+                        quarter_label,
+                    )
+                    downloads.append((year, quarter, official_future, recommended_future))
+                if downloads:
+                    year, quarter, official_future, recommended_future = downloads.popleft()
+                    quarter_label = format_quarter(year, quarter)
+                    if official_future is None:
+                        print(f"Resuming {quarter_label} from checkpoint...")
+                        parsed.append(_resumed_quarter(quarter_label, checkpoint))
+                    else:
+                        print(f"Fetching data for {quarter_label}...")
+                        try:
+                            job = _parse_quarter_documents(
+                                year, quarter, official_future, recommended_future, parse_pool, parse_cache, metrics
+                            )
+                            parsed.append(job._replace(downloads=(official_future, recommended_future)))
+                        except Exception as exc:
+                            _release_downloads(cache, (official_future, recommended_future))
+                            if checkpoint is not None:
+                                checkpoint.mark_failed(quarter_label, exc)
+                            if not archive:
+                                raise
+                            # A full-history backfill records the failure and moves on to the next quarter.
+                            print(f"Skipping {quarter_label}: {exc}")
+                            metrics.fail(quarter_label, exc)
+                while parsed and (parsed[0].pdf_job.done() or not downloads):
+                    job = parsed.popleft()
+                    try:
+                        entries = _finish_quarter(job, parse_cache, metrics, checkpoint)
+                        _release_downloads(cache, job.downloads)
+                    except Exception as exc:
+                        _release_downloads(cache, job.downloads)
+                        if checkpoint is not None:
+                            checkpoint.mark_failed(job.quarter_label, exc)
+                        if not archive:
+                            raise
+                        print(f"Skipping {job.quarter_label}: {exc}")
+                        metrics.fail(job.quarter_label, exc)
+                        continue
+                    yield from entries
+                if not downloads and not parsed:
+                    break
+        except BaseException:
+            for _, _, official_future, recommended_future in downloads:
+                if official_future is not None:
+                    official_future.cancel()
+                    recommended_future.cancel()
+                    _release_downloads(cache, (official_future, recommended_future))
+            for job in parsed:
+                job.pdf_job.cancel()
+                _release_downloads(cache, job.downloads)
+            raise
+        finally:
+            if parse_pool is not None:
+                parse_pool.shutdown(wait=True, cancel_futures=True)
+
+
+def collect_data(
+    max_quarters: Optional[int] = DEFAULT_MAX_QUARTERS,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    session: Optional[requests.Session] = None,
+    cache: Optional[HttpCache] = None,
+    skip_quarters: Optional[Set[Tuple[int, int]]] = None,
+    parse_workers: Optional[int] = None,
+    parse_cache: Optional[ParseCache] = None,
+    metrics: Optional[RunMetrics] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    first_year: Optional[int] = None,
+    last_year: Optional[int] = None,
+    archive: bool = False,
+) -> List[RefundingRow]:
+    return list(
+        iter_collected_entries(
+            max_quarters=max_quarters,
+            concurrency=concurrency,
+            session=session,
+            cache=cache,
+            skip_quarters=skip_quarters,
+            parse_workers=parse_workers,
+            parse_cache=parse_cache,
+            metrics=metrics,
+            checkpoint=checkpoint,
+            first_year=first_year,
+            last_year=last_year,
+            archive=archive,
+        )
+    )
+
+
+@contextmanager
+def _atomic_output(path: str, keep_partial: bool = False) -> Iterator[str]:
+    directory = os.path.dirname(os.path.abspath(path))
+    suffix = os.path.splitext(path)[1] or ".out"
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".refunding-", suffix=f"{suffix}.tmp")
+    os.close(fd)
+    try:
+        yield tmp_path
+    except BaseException:
+        if keep_partial:
+            os.replace(tmp_path, f"{path}.partial")
+        else:
+            os.unlink(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+
+
+def _optional_date(value: object, fmt: str) -> Optional[date]:
+    if not value:
+        return None
+    return datetime.strptime(str(value), fmt).date()
+
+
+def write_csv(entries: Iterable[RefundingRow], path: str, keep_partial: bool = False) -> int:
+    count = 0
+    with _atomic_output(path, keep_partial) as tmp_path:
+        with open(tmp_path, "w", newline="", encoding="utf-8") as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(CSV_FIELDNAMES)
+            for entry in entries:
+                writer.writerow(entry.csv_values())
+                count += 1
+    return count
+
+
+def write_sqlite(entries: Iterable[RefundingRow], path: str, keep_partial: bool = False) -> int:
+    import sqlite3
+
+    count = 0
+    with _atomic_output(path, keep_partial) as tmp_path:
+        connection = sqlite3.connect(tmp_path)
+        try:
+            connection.execute(
+                f"CREATE TABLE {SQLITE_TABLE} ("
+                "Quarter_year TEXT NOT NULL, Date TEXT, Security_type TEXT NOT NULL, Maturity REAL, Units TEXT, "
+                "Auction_month TEXT, Auction_date TEXT, Offered_amount REAL, Data_type TEXT NOT NULL, Notes TEXT)"
+            )
+            insert = f"INSERT INTO {SQLITE_TABLE} VALUES ({', '.join('?' for _ in CSV_FIELDNAMES)})"
+            batch: List[Tuple[object, ...]] = []
+            try:
+                for entry in entries:
+                    batch.append(entry.sql_values())
+                    if len(batch) >= OUTPUT_BATCH_SIZE:
+                        connection.executemany(insert, batch)
+                        connection.commit()
+                        count += len(batch)
+                        batch = []
+            except BaseException:
+                # Committed batches plus the rows collected so far are what --keep-partial leaves behind.
+                connection.executemany(insert, batch)
+                connection.commit()
+                raise
+            connection.executemany(insert, batch)
+            count += len(batch)
+            connection.execute(
+                f"CREATE INDEX idx_{SQLITE_TABLE}_lookup ON {SQLITE_TABLE} (Quarter_year, Data_type, Security_type)"
+            )
+            connection.commit()
+        finally:
+            connection.close()
+    return count
+
+
+PARQUET_REQUIREMENT = "Parquet files require pyarrow (pip install -r requirements-optional.txt)"
+
+
+def parquet_available() -> bool:
+    # find_spec keeps pyarrow out of sys.modules until a Parquet file is actually read or written.
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def write_parquet(entries: Iterable[RefundingRow], path: str, keep_partial: bool = False) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError(PARQUET_REQUIREMENT) from exc
+
+    category = pa.dictionary(pa.int8(), pa.string())
+    schema = pa.schema(
+        [
+            ("Quarter_year", pa.string()),
+            ("Date", pa.date32()),
+            ("Security_type", category),
+            ("Maturity", pa.float64()),
+            ("Units", category),
+            ("Auction_month", pa.date32()),
+            ("Auction_date", pa.date32()),
+            ("Offered_amount", pa.float64()),
+            ("Data_type", category),
+            ("Notes", pa.string()),
+        ]
+    )
+    count = 0
+    with _atomic_output(path, keep_partial) as tmp_path:
+        with pq.ParquetWriter(tmp_path, schema) as writer:
+            columns: Dict[str, List[object]] = {name: [] for name in CSV_FIELDNAMES}
+            try:
+                for entry in entries:
+                    columns["Quarter_year"].append(entry.Quarter_year)
+                    columns["Date"].append(_optional_date(entry.Date, "%Y-%m-%d"))
+                    columns["Security_type"].append(entry.Security_type.value)
+                    columns["Maturity"].append(entry.Maturity)
+                    columns["Units"].append(entry.Units.value or None)
+                    columns["Auction_month"].append(_optional_date(entry.Auction_month, "%Y-%m"))
+                    columns["Auction_date"].append(_optional_date(entry.Auction_date, "%Y-%m-%d"))
+                    columns["Offered_amount"].append(entry.Offered_amount)
+                    columns["Data_type"].append(entry.Data_type.value)
+                    columns["Notes"].append(entry.Notes or None)
+                    count += 1
+                    if len(columns["Quarter_year"]) >= OUTPUT_BATCH_SIZE:
+                        writer.write_table(pa.table(columns, schema=schema))
+                        columns = {name: [] for name in CSV_FIELDNAMES}
+            except BaseException:
+                # Flush the buffered rows before the writer closes, so --keep-partial leaves them in the file.
+                writer.write_table(pa.table(columns, schema=schema))
+                raise
+            if columns["Quarter_year"] or count == 0:
+                writer.write_table(pa.table(columns, schema=schema))
+    return count
+
+
+WRITERS: Dict[str, Callable[[Iterable[RefundingRow], str, bool], int]] = {
+    "csv": write_csv,
+    "parquet": write_parquet,
+    "sqlite": write_sqlite,
+}
+
+
+def read_csv(path: str) -> List[RefundingRow]:
+    with open(path, newline="", encoding="utf-8") as csvfile:
+        return [RefundingRow.from_csv_dict(row) for row in csv.DictReader(csvfile)]
+
+
+def read_sqlite(path: str) -> List[RefundingRow]:
+    import sqlite3
+
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        cursor = connection.execute(f"SELECT {', '.join(CSV_FIELDNAMES)} FROM {SQLITE_TABLE} ORDER BY rowid")
+        return [RefundingRow.from_values(values) for values in cursor]
+    finally:
+        connection.close()
+
+
+def read_parquet(path: str) -> List[RefundingRow]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError(PARQUET_REQUIREMENT) from exc
+
+    formats = {"Date": "%Y-%m-%d", "Auction_month": "%Y-%m", "Auction_date": "%Y-%m-%d"}
+    entries: List[RefundingRow] = []
+    for record in pq.read_table(path).to_pylist():
+        for name, fmt in formats.items():
+            if record[name] is not None:
+                record[name] = record[name].strftime(fmt)
+        entries.append(RefundingRow.from_values(record[name] for name in CSV_FIELDNAMES))
+    return entries
+
+
+READERS: Dict[str, Callable[[str], List[RefundingRow]]] = {
+    "csv": read_csv,
+    "parquet": read_parquet,
+    "sqlite": read_sqlite,
+}
+
+
+def existing_quarters(path: str, output_format: str = "csv") -> Set[Tuple[int, int]]:
+    if not os.path.exists(path):
+        return set()
+    quarters: Set[Tuple[int, int]] = set()
+    for row in READERS[output_format](path):
+        key = parse_quarter_label(row.Quarter_year)
+        if key is not None:
+            quarters.add(key)
+    return quarters
+
+
+def _merged_rows(existing_entries: List[RefundingRow], added: List[RefundingRow]) -> List[RefundingRow]:
+    added_quarters = {entry.Quarter_year for entry in added}
+    merged = [entry for entry in existing_entries if entry.Quarter_year not in added_quarters] + added
+    merged.sort(key=lambda entry: parse_quarter_label(entry.Quarter_year) or (0, 0), reverse=True)
+    return merged
+
+
+def merge_csv(new_entries: Iterable[RefundingRow], path: str, keep_partial: bool = False) -> int:
+    existing_entries = read_csv(path) if os.path.exists(path) else []
+    added: List[RefundingRow] = []
+    try:
+        added.extend(new_entries)
+    except BaseException:
+        if keep_partial:
+            # The output stays untouched; the partial file holds it merged with the quarters collected so far.
+            write_csv(_merged_rows(existing_entries, added), f"{path}.partial")
+        raise
+    write_csv(_merged_rows(existing_entries, added), path)
+    return len(added)
+
+
+_DATA_TYPE_PRECEDENCE = {
+    DataType.INDICATIONS_FOR_NEXT_REFUNDING: 0,
+    DataType.RECOMMENDATION_FOR_THIS_REFUNDING: 1,
+    DataType.HISTORICAL_REFERENCE: 2,
+}
+
+ConsolidationKey = Tuple[str, SecurityType, Optional[float], Units]
+
+
+class Consolidator:
+    def __init__(self, metrics: Optional[RunMetrics] = None) -> None:
+        self.metrics = metrics or RunMetrics()
+        self._latest: Dict[ConsolidationKey, Dict[str, Tuple[Tuple[int, str], RefundingRow]]] = {}
+
+    def add(self, entry: RefundingRow) -> None:
+        # Rows without an auction month cannot be matched across snapshots, so they stay per quarter.
+        month = entry.Auction_month or entry.Quarter_year
+        auctions = self._latest.setdefault((month, entry.Security_type, entry.Maturity, entry.Units), {})
+        rank = (_DATA_TYPE_PRECEDENCE[entry.Data_type], entry.Date)
+        # Two dated rows with different dates are separate auctions of the month. An undated row, such as an
+        # actual from the historical table, matches whatever auctions of the month are already known.
+        if entry.Auction_date in auctions:
+            matches = [entry.Auction_date]
+        elif entry.Auction_date:
+            matches = [""] if "" in auctions else []
+        else:
+            matches = list(auctions)
+        if not matches:
+            auctions[entry.Auction_date] = (rank, entry)
+            return
+        best_rank, best = max((auctions[auction_date] for auction_date in matches), key=lambda item: item[0])
+        if rank > best_rank:
+            self.metrics.increment("consolidation_superseded", len(matches))
+            for auction_date in matches:
+                del auctions[auction_date]
+            auctions[entry.Auction_date] = (rank, entry)
+            return
+        self.metrics.increment("consolidation_superseded")
+        if rank == best_rank and entry.Offered_amount != best.Offered_amount:
+            self.metrics.increment("consolidation_conflicts")
+
+    def consume(self, entries: Iterable[RefundingRow]) -> Iterator[RefundingRow]:
         for entry in entries:
-            writer.writerow(entry)
+            self.add(entry)
+            yield entry
+
+    def entries(self) -> List[RefundingRow]:
+        rows = [entry for auctions in self._latest.values() for _, entry in auctions.values()]
+        rows.sort(key=lambda entry: entry.Auction_month, reverse=True)
+        return rows
+
+
+def consolidate_entries(entries: Iterable[RefundingRow], metrics: Optional[RunMetrics] = None) -> List[RefundingRow]:
+    consolidator = Consolidator(metrics)
+    for entry in entries:
+        consolidator.add(entry)
+    return consolidator.entries()
+
+
+def check_new_quarters(
+    max_quarters: int = DEFAULT_MAX_QUARTERS,
+    known_quarters: Optional[Set[Tuple[int, int]]] = None,
+    session: Optional[requests.Session] = None,
+    cache: Optional[HttpCache] = None,
+    metrics: Optional[RunMetrics] = None,
+) -> List[Tuple[int, int]]:
+    metrics = metrics or RunMetrics()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        official_links_future = executor.submit(extract_official_links, session, cache, metrics)
+        recommended_links_future = executor.submit(extract_recommended_links, session, cache, metrics)
+        available_quarters = sorted(
+            set(official_links_future.result()) & set(recommended_links_future.result()),
+            reverse=True,
+        )
+    return [key for key in available_quarters[:max_quarters] if not known_quarters or key not in known_quarters]
+
+
+def check_main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="collect_refunding_data.py check",
+        description="Fetch only the two Treasury index pages and report quarters missing from the output",
+    )
+    parser.add_argument(
+        "--max-quarters",
+        type=int,
+        default=DEFAULT_MAX_QUARTERS,
+        help="Number of most recent quarters to consider",
+    )
+    parser.add_argument("--output", default="refunding_data.csv", help="Existing output file to compare against")
+    parser.add_argument("--format", choices=sorted(READERS), default="csv", help="Format of the output file")
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help="Directory of the persistent HTTP cache; index pages are revalidated with conditional GETs",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Download the index pages without the HTTP cache")
+    parser.add_argument("--offline", action="store_true", help="Read the index pages from the HTTP cache only")
+    parser.add_argument(
+        "--exit-status",
+        action="store_true",
+        help="Exit with status 1 when there are no new quarters, so schedulers can chain a collection run",
+    )
+    args = parser.parse_args(argv)
+    if args.offline and args.no_cache:
+        parser.error("--offline requires the HTTP cache")
+    if args.format == "parquet" and not parquet_available():
+        parser.error(PARQUET_REQUIREMENT)
+
+    cache = None
+    if not args.no_cache:
+        cache = HttpCache(args.cache_dir, offline=args.offline)
+    try:
+        new_quarters = check_new_quarters(
+            max_quarters=args.max_quarters,
+            known_quarters=existing_quarters(args.output, args.format),
+            session=None if args.offline else create_session(),
+            cache=cache,
+        )
+    finally:
+        if cache is not None:
+            cache.flush()
+    if new_quarters:
+        print(f"New quarters: {', '.join(format_quarter(year, quarter) for year, quarter in new_quarters)}")
+        return 0
+    print(f"No new quarters beyond {args.output}")
+    return 1 if args.exit_status else 0
+
 
+def _announcement_window(moment: datetime) -> Tuple[datetime, datetime]:
+    # The window that contains the moment or, failing that, the next one to open.
+    ordinal = moment.year * 12 + moment.month - 1
+    while True:
+        year, month = divmod(ordinal, 12)
+        ordinal += 1
+        if month + 1 not in ANNOUNCEMENT_MONTHS:
+            continue
+        opening = moment.replace(year=year, month=month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
+        end = opening + timedelta(days=ANNOUNCEMENT_WINDOW_DAYS)
+        if end > moment:
+            return opening - timedelta(days=ANNOUNCEMENT_LEAD_DAYS), end
+
+
+def in_announcement_window(moment: datetime) -> bool:
+    return _announcement_window(moment)[0] <= moment
+
+
+def next_poll_delay(
+    moment: datetime,
+    idle_polls: int,
+    interval: float = DEFAULT_WATCH_INTERVAL,
+    max_interval: float = DEFAULT_WATCH_MAX_INTERVAL,
+) -> float:
+    if in_announcement_window(moment):
+        return interval
+    # Between announcements every empty poll doubles the delay, but never past the start of the next window.
+    backoff = min(max_interval, interval * 2 ** min(idle_polls, 32))
+    until_window = (_announcement_window(moment)[0] - moment).total_seconds()
+    return max(interval, min(backoff, until_window))
+
+
+def _complete_quarters(
+    official_links: QuarterLinks, recommended_links: QuarterLinks
+) -> Dict[Tuple[int, int], Tuple[str, str]]:
+    return {key: (official_links[key], recommended_links[key]) for key in official_links.keys() & recommended_links}
+
+
+def diff_quarter_links(
+    previous: Dict[Tuple[int, int], Tuple[str, str]], current: Dict[Tuple[int, int], Tuple[str, str]]
+) -> List[Tuple[int, int]]:
+    return sorted((key for key, urls in current.items() if previous.get(key) != urls), reverse=True)
+
+
+class WatchState:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.official_links: QuarterLinks = {}
+        self.recommended_links: QuarterLinks = {}
+        self.failures: Dict[Tuple[int, int], int] = {}
+        self.initialized = False
+        self._collected: Set[Tuple[int, int]] = set()
+        self._output_signature: Optional[Tuple[int, int]] = None
+        try:
+            with open(path, encoding="utf-8") as handle:
+                state = json.load(handle)
+        except (OSError, ValueError):
+            return
+        if isinstance(state, dict):
+            self.official_links = self._links(state.get("official", {}))
+            self.recommended_links = self._links(state.get("recommended", {}))
+            for label, count in state.get("failures", {}).items():
+                key = parse_quarter_label(label)
+                if key is not None and isinstance(count, int):
+                    self.failures[key] = count
+            self.initialized = True
+
+    @staticmethod
+    def _links(labels: Dict[str, str]) -> QuarterLinks:
+        links: QuarterLinks = {}
+        for label, url in labels.items():
+            key = parse_quarter_label(label)
+            if key is not None:
+                links[key] = url
+        return links
+
+    @staticmethod
+    def _signature(output: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(output)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
 
-def main() -> None:
-    parser = argparse.ArgumentParser(description="Collect Treasury refunding data")
+    def collected_quarters(self, output: str) -> Set[Tuple[int, int]]:
+        # The output is only re-read when something other than this watcher has changed it.
+        signature = self._signature(output)
+        if signature is None:
+            self._collected = set()
+        elif signature != self._output_signature:
+            self._collected = existing_quarters(output)
+        self._output_signature = signature
+        return set(self._collected)
+
+    def record_appended(self, output: str, key: Tuple[int, int]) -> None:
+        self._collected.add(key)
+        self._output_signature = self._signature(output)
+
+    def save(self, official_links: QuarterLinks, recommended_links: QuarterLinks) -> None:
+        self.official_links = dict(official_links)
+        self.recommended_links = dict(recommended_links)
+        self.initialized = True
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with _atomic_output(self.path) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as handle:
+                state = {
+                    "official": {format_quarter(*key): url for key, url in sorted(official_links.items())},
+                    "recommended": {format_quarter(*key): url for key, url in sorted(recommended_links.items())},
+                    "failures": {format_quarter(*key): count for key, count in sorted(self.failures.items())},
+                    "updated": datetime.now().isoformat(timespec="seconds"),
+                }
+                json.dump(state, handle, indent=2)
+
+
+class QuarterWatcher:
+    def __init__(
+        self,
+        output: str,
+        state: WatchState,
+        session: Optional[requests.Session] = None,
+        cache: Optional[HttpCache] = None,
+        parse_cache: Optional[ParseCache] = None,
+        metrics: Optional[RunMetrics] = None,
+        max_quarters: int = DEFAULT_MAX_QUARTERS,
+        parse_workers: Optional[int] = None,
+        interval: float = DEFAULT_WATCH_INTERVAL,
+        max_interval: float = DEFAULT_WATCH_MAX_INTERVAL,
+        now: Callable[[], datetime] = datetime.now,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if interval <= 0 or max_interval < interval:
+            raise ValueError("interval must be positive and not above max_interval")
+        self.output = output
+        self.state = state
+        self.session = session or create_session()
+        self.cache = cache
+        self.parse_cache = parse_cache
+        self.metrics = metrics or RunMetrics()
+        self.max_quarters = max_quarters
+        self.parse_workers = parse_workers
+        self.interval = interval
+        self.max_interval = max_interval
+        self.now = now
+        self.sleep = sleep
+        self.idle_polls = 0
+
+    def poll(self) -> List[Tuple[int, int]]:
+        self.metrics.increment("watch_polls")
+        # With an HTTP cache both index pages are conditional GETs, so a quiet poll transfers almost nothing.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            official_future = executor.submit(extract_official_links, self.session, self.cache, self.metrics)
+            recommended_future = executor.submit(extract_recommended_links, self.session, self.cache, self.metrics)
+            official_links, recommended_links = official_future.result(), recommended_future.result()
+        current = _complete_quarters(official_links, recommended_links)
+        known = self.state.collected_quarters(self.output)
+        if self.state.initialized:
+            previous = _complete_quarters(self.state.official_links, self.state.recommended_links)
+            # Re-linked quarters are fetched again and replace their rows; new ones only if not collected yet.
+            targets = [key for key in diff_quarter_links(previous, current) if key in previous or key not in known]
+        else:
+            targets = [key for key in sorted(current, reverse=True)[: self.max_quarters] if key not in known]
+        saved_links = (dict(official_links), dict(recommended_links))
+        fetched: List[Tuple[int, int]] = []
+        # Quarters are collected one at a time so a broken document only holds back its own quarter.
+        for key in targets:
+            label = format_quarter(*key)
+            try:
+                entries = iter_collected_entries(
+                    max_quarters=None,
+                    session=self.session,
+                    cache=self.cache,
+                    skip_quarters=set(current) - {key},
+                    parse_workers=self.parse_workers,
+                    parse_cache=self.parse_cache,
+                    metrics=self.metrics,
+                    quarter_links=(official_links, recommended_links),
+                )
+                added = merge_csv(entries, self.output)
+                if added:
+                    self.state.record_appended(self.output, key)
+            except Exception as exc:
+                self.metrics.increment("watch_quarter_failures", quarter=label)
+                failures = self.state.failures.get(key, 0) + 1
+                if failures >= WATCH_MAX_QUARTER_FAILURES:
+                    # Recording the current links stops the retries until Treasury re-links the documents.
+                    print(f"Giving up on {label} after {failures} failed polls: {exc}")
+                    self.state.failures.pop(key, None)
+                    continue
+                print(f"Collecting {label} failed, retrying on the next poll: {exc}")
+                self.state.failures[key] = failures
+                for links, previous in zip(saved_links, (self.state.official_links, self.state.recommended_links)):
+                    if key in previous:
+                        links[key] = previous[key]
+                    else:
+                        links.pop(key, None)
+                continue
+            self.state.failures.pop(key, None)
+            self.metrics.increment("watch_quarters_fetched")
+            fetched.append(key)
+            print(f"Appended {added} rows for {label} to {self.output}")
+        self.state.save(*saved_links)
+        if self.cache is not None:
+            self.cache.flush()
+        self.idle_polls = 0 if fetched else self.idle_polls + 1
+        return fetched
+
+    def run(self, max_polls: Optional[int] = None) -> None:
+        polls = 0
+        while True:
+            try:
+                self.poll()
+            except Exception as exc:
+                # The state is only saved after a successful poll, so the same quarters are retried next time.
+                print(f"Poll failed: {exc}")
+                self.metrics.increment("watch_poll_failures")
+                self.idle_polls += 1
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                return
+            self.sleep(next_poll_delay(self.now(), self.idle_polls, self.interval, self.max_interval))
+
+
+def watch_main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="collect_refunding_data.py watch",
+        description=(
+            "Poll the two Treasury index pages and append newly published quarters to a CSV output, "
+            "polling more often around the February/May/August/November refunding announcements"
+        ),
+    )
+    parser.add_argument("--output", default="refunding_data.csv", help="CSV output to append new quarters to")
     parser.add_argument(
         "--max-quarters",
         type=int,
         default=DEFAULT_MAX_QUARTERS,
+        help="Number of most recent quarters to backfill on the first poll without a state file",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help="Directory of the persistent HTTP cache; index pages are revalidated with conditional GETs",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Poll without the HTTP cache")
+    parser.add_argument("--no-parse-cache", action="store_true", help="Disable the persistent parsed-result cache")
+    parser.add_argument(
+        "--state-file",
+        default=None,
+        help=f"Last seen quarter links (default: <cache-dir>/{WATCH_STATE_FILENAME})",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_WATCH_INTERVAL,
+        help="Seconds between polls during announcement windows and the starting backoff delay",
+    )
+    parser.add_argument(
+        "--max-interval",
+        type=float,
+        default=DEFAULT_WATCH_MAX_INTERVAL,
+        help="Longest delay between polls outside announcement windows",
+    )
+    parser.add_argument("--once", action="store_true", help="Poll a single time and exit")
+    parser.add_argument("--parse-workers", type=int, default=None, help="Processes used to parse PDFs")
+    parser.add_argument("--report", default=None, help="Write a JSON run report to this path on exit")
+    args = parser.parse_args(argv)
+    if args.interval <= 0 or args.max_interval < args.interval:
+        parser.error("--interval must be positive and not above --max-interval")
+    if args.max_quarters < 1:
+        parser.error("--max-quarters must be at least 1")
+    if args.parse_workers is not None and args.parse_workers < 1:
+        parser.error("--parse-workers must be at least 1")
+
+    cache = None if args.no_cache else HttpCache(args.cache_dir)
+    parse_cache = None if args.no_parse_cache else ParseCache(os.path.join(args.cache_dir, PARSE_CACHE_FILENAME))
+    metrics = RunMetrics()
+    watcher = QuarterWatcher(
+        args.output,
+        WatchState(args.state_file or os.path.join(args.cache_dir, WATCH_STATE_FILENAME)),
+        cache=cache,
+        parse_cache=parse_cache,
+        metrics=metrics,
+        max_quarters=args.max_quarters,
+        parse_workers=args.parse_workers,
+        interval=args.interval,
+        max_interval=args.max_interval,
+    )
+    try:
+        watcher.run(max_polls=1 if args.once else None)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if cache is not None:
+            cache.flush()
+        if args.report:
+            metrics.write_json(args.report)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["check"]:
+        sys.exit(check_main(argv[1:]))
+    if argv[:1] == ["watch"]:
+        sys.exit(watch_main(argv[1:]))
+    parser = argparse.ArgumentParser(
+        description="Collect Treasury refunding data",
+        epilog=(
+            "Use 'check' as the first argument to only look for new quarters on the index pages, "
+            "or 'watch' to keep polling them and append newly published quarters."
+        ),
+    )
+    parser.add_argument(
+        "--max-quarters",
+        type=int,
+        default=None,
         help=(
             "Number of most recent quarters to retrieve that have both official remarks "
-            "and TBAC recommended tables"
+            f"and TBAC recommended tables (default {DEFAULT_MAX_QUARTERS}, unlimited with --archive)"
         ),
     )
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help=(
+            "Walk the full history, keeping quarters that have only one of the two documents "
+            "and skipping quarters that fail to download or parse"
+        ),
+    )
+    parser.add_argument("--from-year", type=int, default=None, help="Earliest calendar year to collect")
+    parser.add_argument("--to-year", type=int, default=None, help="Latest calendar year to collect")
     parser.add_argument(
         "--output",
         default="refunding_data.csv",
-        help="Destination CSV file path",
+        help="Destination file path",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--format",
+        choices=sorted(WRITERS),
+        default="csv",
+        help="Output format: CSV text, typed Parquet columns or an indexed SQLite table",
+    )
+    parser.add_argument(
+        "--consolidated",
+        default=None,
+        help="Also write a deduplicated table holding the latest known value per auction month and security "
+        "(actuals beat recommendations, which beat indications; newer announcements win within a kind)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only fetch quarters missing from the existing output file and merge them into it",
+    )
+    parser.add_argument(
+        "--keep-partial",
+        action="store_true",
+        help="If the run is interrupted, keep the rows collected so far in <output>.partial",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Number of documents to download in parallel",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Number of processes parsing recommended financing PDFs (defaults to the CPU count)",
+    )
+    parser.add_argument(
+        "--connections-per-host",
+        type=int,
+        default=DEFAULT_CONNECTIONS_PER_HOST,
+        help="Maximum number of pooled connections opened to a single host",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help="Retries with exponential backoff for GETs failing with a connection error, timeout, 429 or 5xx",
+    )
+    parser.add_argument(
+        "--rate-limit",
+        type=float,
+        default=DEFAULT_RATE_LIMIT,
+        help="Maximum sustained requests per second sent to Treasury (0 disables the limit)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=DEFAULT_CACHE_DIR,
+        help="Directory of the persistent HTTP cache for Treasury pages and PDFs",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=DEFAULT_CACHE_MAX_BYTES // (1024 * 1024),
+        help="Size cap of the HTTP cache; least recently used documents are evicted beyond it",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always download documents without consulting the HTTP cache",
+    )
+    parser.add_argument(
+        "--no-parse-cache",
+        action="store_true",
+        help="Re-parse every document instead of reusing results cached by document hash",
+    )
+    parser.add_argument(
+        "--offline",
+        action="store_true",
+        help="Serve every document from the HTTP cache without touching the network",
+    )
+    parser.add_argument(
+        "--checkpoint-dir",
+        default=None,
+        help="Record per-quarter rows and a status manifest in this directory as quarters complete, so an "
+        "interrupted run can be resumed",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse quarters completed by an earlier checkpointed run and fetch only failed or missing ones "
+        f"(checkpoints default to <cache-dir>/{CHECKPOINT_DIRNAME})",
+    )
+    parser.add_argument(
+        "--report",
+        default=None,
+        help="Write a JSON run report with per-stage timings, counters and per-quarter details",
+    )
+    parser.add_argument(
+        "--metrics",
+        default=None,
+        help="Write the run metrics in Prometheus text exposition format",
+    )
+    parser.add_argument(
+        "--profile",
+        default=None,
+        help="Write cProfile statistics of the parse stages (PDFs are then parsed in-process)",
+    )
+    args = parser.parse_args(argv)
+    if args.incremental and args.format != "csv":
+        parser.error("--incremental is only supported for CSV output")
+    if args.format == "parquet" and not parquet_available():
+        parser.error(PARQUET_REQUIREMENT)
+    if args.consolidated and os.path.abspath(args.consolidated) == os.path.abspath(args.output):
+        parser.error("--consolidated must differ from --output")
+    if args.offline and args.no_cache:
+        parser.error("--offline requires the HTTP cache")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.parse_workers is not None and args.parse_workers < 1:
+        parser.error("--parse-workers must be at least 1")
+    if args.connections_per_host < 1:
+        parser.error("--connections-per-host must be at least 1")
+    if args.retries < 0:
+        parser.error("--retries must not be negative")
+    if args.rate_limit < 0:
+        parser.error("--rate-limit must not be negative")
+    if args.max_quarters is not None and args.max_quarters < 1:
+        parser.error("--max-quarters must be at least 1")
+    if args.from_year is not None and args.to_year is not None and args.from_year > args.to_year:
+        parser.error("--from-year must not be after --to-year")
+    if args.max_quarters is None and not args.archive:
+        args.max_quarters = DEFAULT_MAX_QUARTERS
 
-    entries = collect_data(max_quarters=args.max_quarters)
-    write_csv(entries, args.output)
-    print(f"Wrote {len(entries)} rows to {args.output}")
+    cache = None
+    if not args.no_cache:
+        cache = HttpCache(args.cache_dir, max_bytes=args.cache_max_mb * 1024 * 1024, offline=args.offline)
+    parse_cache = None
+    if not args.no_parse_cache:
+        parse_cache = ParseCache(os.path.join(args.cache_dir, PARSE_CACHE_FILENAME))
+    checkpoint = None
+    if args.resume or args.checkpoint_dir:
+        checkpoint = Checkpoint(args.checkpoint_dir or os.path.join(args.cache_dir, CHECKPOINT_DIRNAME), args.resume)
+    metrics = RunMetrics(profile=args.profile is not None)
+    entries = iter_collected_entries(
+        max_quarters=args.max_quarters,
+        concurrency=args.concurrency,
+        session=create_session(args.connections_per_host, args.retries, rate_limit=args.rate_limit),
+        cache=cache,
+        skip_quarters=existing_quarters(args.output) if args.incremental else None,
+        parse_workers=args.parse_workers,
+        parse_cache=parse_cache,
+        metrics=metrics,
+        checkpoint=checkpoint,
+        first_year=args.from_year,
+        last_year=args.to_year,
+        archive=args.archive,
+    )
+    entries = metrics.timed_iter(entries, "collect")
+    consolidator = Consolidator(metrics) if args.consolidated and not args.incremental else None
+    if consolidator is not None:
+        entries = consolidator.consume(entries)
+    write_start = time.perf_counter()
+    try:
+        if args.incremental:
+            added = merge_csv(entries, args.output, args.keep_partial)
+            message = f"Merged {added} new rows into {args.output}"
+        else:
+            count = WRITERS[args.format](entries, args.output, args.keep_partial)
+            message = f"Wrote {count} rows to {args.output}"
+        metrics.record("write", time.perf_counter() - write_start - metrics.stage_seconds("collect"))
+        if args.consolidated:
+            with metrics.stage("consolidate"):
+                if consolidator is not None:
+                    consolidated = consolidator.entries()
+                else:
+                    consolidated = consolidate_entries(read_csv(args.output), metrics)
+                consolidated_count = WRITERS[args.format](consolidated, args.consolidated, args.keep_partial)
+            message += f"; {consolidated_count} consolidated rows to {args.consolidated}"
+        if metrics.failures:
+            message += f"; skipped {len(metrics.failures)} failed quarters: {', '.join(metrics.failures)}"
+    finally:
+        if cache is not None:
+            cache.flush()
+        if args.report:
+            metrics.write_json(args.report)
+        if args.metrics:
+            metrics.write_prometheus(args.metrics)
+        if args.profile:
+            metrics.write_profile(args.profile)
+    print(message)
 
 
 
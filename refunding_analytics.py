@@ -0,0 +1,205 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError as exc:
+    raise ImportError("refunding_analytics requires numpy (pip install -r requirements-optional.txt)") from exc
+
+from collect_refunding_data import DataType, RefundingRow, SecurityType, Units
+
+LAYERS = (
+    DataType.RECOMMENDATION_FOR_THIS_REFUNDING,
+    DataType.INDICATIONS_FOR_NEXT_REFUNDING,
+    DataType.HISTORICAL_REFERENCE,
+)
+RECOMMENDED, INDICATED, ACTUAL = range(len(LAYERS))
+COUPON_SECURITIES = frozenset({SecurityType.NOTE, SecurityType.BOND, SecurityType.TIPS, SecurityType.FRN})
+# Refunding quarters are announced in early Feb/May/Aug/Nov and cover that month and the next two.
+REFUNDING_QUARTER_START_MONTHS = (2, 5, 8, 11)
+
+SeriesKey = Tuple[SecurityType, Optional[float], Units]
+
+
+class RefundingArrays(NamedTuple):
+    series: List[SeriesKey]
+    months: List[str]
+    values: np.ndarray
+
+
+def series_label(key: SeriesKey) -> str:
+    security, maturity, units = key
+    if maturity is None:
+        return security.value
+    return f"{maturity:g}-{units.value} {security.value}" if units.value else f"{maturity:g} {security.value}"
+
+
+def _month_ordinal(auction_month: str) -> int:
+    year, month = auction_month.split("-")
+    return int(year) * 12 + int(month) - 1
+
+
+def _month_label(ordinal: int) -> str:
+    return f"{ordinal // 12:04d}-{ordinal % 12 + 1:02d}"
+
+
+def _refunding_quarter_label(ordinal: int) -> str:
+    year, month = ordinal // 12, ordinal % 12 + 1
+    if month < REFUNDING_QUARTER_START_MONTHS[0]:
+        year, month = year - 1, month + 12
+    return f"Q{(month - REFUNDING_QUARTER_START_MONTHS[0]) // 3 + 1} {year}"
+
+
+def build_arrays(rows: Iterable[RefundingRow]) -> RefundingArrays:
+    layer_of = {data_type: layer for layer, data_type in enumerate(LAYERS)}
+    series_of: Dict[SeriesKey, int] = {}
+    layers: List[int] = []
+    series: List[int] = []
+    months: List[int] = []
+    dates: List[str] = []
+    amounts: List[float] = []
+    for row in rows:
+        if not row.Auction_month:
+            continue
+        key = (row.Security_type, row.Maturity, row.Units)
+        layers.append(layer_of[row.Data_type])
+        series.append(series_of.setdefault(key, len(series_of)))
+        months.append(_month_ordinal(row.Auction_month))
+        dates.append(row.Date)
+        amounts.append(row.Offered_amount)
+    if not amounts:
+        return RefundingArrays([], [], np.empty((len(LAYERS), 0, 0)))
+
+    # Series are sorted for stable output; months span a contiguous range so shifts along the axis are calendar moves.
+    keys = sorted(series_of, key=lambda key: (key[0].value, key[2].value, key[1] is None, key[1] or 0.0))
+    remap = np.empty(len(keys), dtype=np.intp)
+    remap[[series_of[key] for key in keys]] = np.arange(len(keys))
+    series_index = remap[np.asarray(series, dtype=np.intp)]
+    month_ordinals = np.asarray(months, dtype=np.intp)
+    first_month = int(month_ordinals.min())
+    month_index = month_ordinals - first_month
+    month_count = int(month_ordinals.max()) - first_month + 1
+    layer_index = np.asarray(layers, dtype=np.intp)
+
+    # When several announcements report the same cell, the most recent one wins.
+    flat = np.ravel_multi_index((layer_index, series_index, month_index), (len(LAYERS), len(keys), month_count))
+    newest_first = np.argsort(np.asarray(dates), kind="stable")[::-1]
+    cells, first = np.unique(flat[newest_first], return_index=True)
+    values = np.full(len(LAYERS) * len(keys) * month_count, np.nan)
+    values[cells] = np.asarray(amounts, dtype=np.float64)[newest_first][first]
+    return RefundingArrays(
+        keys,
+        [_month_label(first_month + offset) for offset in range(month_count)],
+        values.reshape(len(LAYERS), len(keys), month_count),
+    )
+
+
+def deltas(arrays: RefundingArrays) -> Dict[str, np.ndarray]:
+    values = arrays.values
+    return {
+        "actual_minus_recommended": values[ACTUAL] - values[RECOMMENDED],
+        "actual_minus_indicated": values[ACTUAL] - values[INDICATED],
+        "recommended_minus_indicated": values[RECOMMENDED] - values[INDICATED],
+    }
+
+
+def best_known(arrays: RefundingArrays) -> np.ndarray:
+    values = arrays.values
+    combined = np.where(np.isnan(values[ACTUAL]), values[RECOMMENDED], values[ACTUAL])
+    return np.where(np.isnan(combined), values[INDICATED], combined)
+
+
+def _quarter_starts(arrays: RefundingArrays) -> Tuple[List[str], np.ndarray]:
+    first_month = _month_ordinal(arrays.months[0]) if arrays.months else 0
+    labels: List[str] = []
+    starts: List[int] = []
+    for offset in range(len(arrays.months)):
+        label = _refunding_quarter_label(first_month + offset)
+        if not labels or labels[-1] != label:
+            labels.append(label)
+            starts.append(offset)
+    return labels, np.asarray(starts, dtype=np.intp)
+
+
+def quarter_totals(arrays: RefundingArrays, matrix: np.ndarray) -> Tuple[List[str], np.ndarray]:
+    labels, starts = _quarter_starts(arrays)
+    if not labels:
+        return labels, np.empty(matrix.shape[:-1] + (0,))
+    present = ~np.isnan(matrix)
+    totals = np.add.reduceat(np.where(present, matrix, 0.0), starts, axis=-1)
+    counts = np.add.reduceat(present, starts, axis=-1)
+    return labels, np.where(counts > 0, totals, np.nan)
+
+
+def quarter_over_quarter(arrays: RefundingArrays) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    labels, totals = quarter_totals(arrays, best_known(arrays))
+    changes = np.full_like(totals, np.nan)
+    changes[:, 1:] = np.diff(totals, axis=1)
+    return labels, totals, changes
+
+
+def coupon_issuance_totals(arrays: RefundingArrays) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    coupon = np.asarray([key[0] in COUPON_SECURITIES for key in arrays.series], dtype=bool)
+    layers = {
+        "recommended": arrays.values[RECOMMENDED],
+        "indicated": arrays.values[INDICATED],
+        "actual": arrays.values[ACTUAL],
+        "best_known": best_known(arrays),
+    }
+    results: Dict[str, np.ndarray] = {}
+    labels: List[str] = []
+    for name, matrix in layers.items():
+        labels, totals = quarter_totals(arrays, matrix[coupon])
+        present = ~np.isnan(totals)
+        summed = np.where(present, totals, 0.0).sum(axis=0)
+        results[name] = np.where(present.any(axis=0), summed, np.nan)
+    return labels, results
+
+
+def _number(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def delta_records(arrays: RefundingArrays) -> List[Dict[str, object]]:
+    differences = deltas(arrays)
+    measured = ~np.all(np.isnan(np.stack(list(differences.values()))), axis=0)
+    records: List[Dict[str, object]] = []
+    for series_index, month_index in zip(*np.nonzero(measured)):
+        record: Dict[str, object] = {
+            "series": series_label(arrays.series[series_index]),
+            "auction_month": arrays.months[month_index],
+            "recommended": _number(arrays.values[RECOMMENDED, series_index, month_index]),
+            "indicated": _number(arrays.values[INDICATED, series_index, month_index]),
+            "actual": _number(arrays.values[ACTUAL, series_index, month_index]),
+        }
+        for name, matrix in differences.items():
+            record[name] = _number(matrix[series_index, month_index])
+        records.append(record)
+    return records
+
+
+def quarter_over_quarter_records(arrays: RefundingArrays) -> List[Dict[str, object]]:
+    labels, totals, changes = quarter_over_quarter(arrays)
+    return [
+        {
+            "series": series_label(arrays.series[series_index]),
+            "quarter": labels[quarter_index],
+            "total": _number(totals[series_index, quarter_index]),
+            "change": _number(changes[series_index, quarter_index]),
+        }
+        for series_index, quarter_index in zip(*np.nonzero(~np.isnan(totals)))
+    ]
+
+
+def coupon_total_records(arrays: RefundingArrays) -> List[Dict[str, object]]:
+    labels, totals = coupon_issuance_totals(arrays)
+    return [
+        {"quarter": label, **{name: _number(values[index]) for name, values in totals.items()}}
+        for index, label in enumerate(labels)
+    ]
+
+
+REPORTS = {
+    "deltas": delta_records,
+    "qoq": quarter_over_quarter_records,
+    "coupon-totals": coupon_total_records,
+}
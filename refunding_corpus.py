@@ -0,0 +1,440 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from collect_refunding_data import (
+    MATRIX_TABLE_COLUMNS,
+    StoredDocument,
+    parse_official_article,
+    parse_recommended_pdf,
+)
+
+CORPUS_MANIFEST = "manifest.json"
+DOCUMENT_KINDS = ("official", "matrix", "regex")
+PARSER_LABELS = {
+    "official": "parse_official_article",
+    "matrix": "parse_recommended_pdf[matrix]",
+    "regex": "parse_recommended_pdf[regex_fallback]",
+}
+DEFAULT_SIZES = (1, 2, 4, 8)
+DEFAULT_DOCUMENTS_PER_SIZE = 5
+DEFAULT_SEED = 2025
+
+_LANDSCAPE = (792, 612)
+_PORTRAIT = (612, 792)
+_MARGIN = 18
+_CELL_WIDTH = 21
+_ROW_HEIGHT = 12
+_FONT_SIZE = 5
+_MATRIX_ROWS_PER_PAGE = 40
+_TEXT_LINE_HEIGHT = 14
+_TEXT_LINES_PER_PAGE = 50
+_OFFICIAL_ROWS_PER_SIZE = 12
+# Roughly the weight of the navigation and footer markup around a real remarks article.
+_OFFICIAL_PADDING_LINKS = 2000
+_MONTH_NAMES = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+_OFFICIAL_HEADERS = ("2-Year", "3-Year", "5-Year", "7-Year", "10-Year", "20-Year", "30-Year", "FRN")
+_FALLBACK_SECURITIES = (
+    "13-Week Bill",
+    "26-Week Bill",
+    "2-Year Note",
+    "3-Year Note",
+    "5-Year Note",
+    "7-Year Note",
+    "10-Year Note (r)",
+    "20-Year Bond (r)",
+    "30-Year Bond",
+    "5-Year TIPS",
+    "10-Year TIPS (r)",
+    "2-Year FRN",
+)
+
+
+class CorpusDocument(NamedTuple):
+    name: str
+    kind: str
+    size: int
+    year: int
+    quarter: int
+    announcement_date: str
+    expected_rows: int
+    path: str
+    sha256: str
+    size_bytes: int
+
+
+class ThroughputResult(NamedTuple):
+    parser: str
+    size: int
+    documents: int
+    rows: int
+    mismatches: int
+    seconds: float
+    peak_rss_kib: Optional[int]
+
+    @property
+    def documents_per_second(self) -> float:
+        return self.documents / self.seconds if self.seconds else 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _month_label(ordinal: int) -> str:
+    return f"{_MONTH_NAMES[ordinal % 12]}-{ordinal // 12 % 100:02d}"
+
+
+def _first_auction_month(year: int, quarter: int) -> int:
+    # Refunding quarters start in February, May, August and November.
+    return year * 12 + 3 * (quarter - 1) + 1
+
+
+def _pdf_text(x: float, y: float, text: str) -> str:
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return f"BT /F1 {_FONT_SIZE} Tf {x:.2f} {y:.2f} Td ({escaped}) Tj ET"
+
+
+def build_pdf(pages: Sequence[str], media_box: Tuple[int, int]) -> bytes:
+    width, height = media_box
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids: List[int] = []
+    for content in pages:
+        stream = content.encode("latin-1")
+        page_ids.append(len(objects) + 1)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects) + 2} 0 R >>".encode("ascii")
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("ascii")
+
+    document = bytearray(b"%PDF-1.4\n")
+    offsets: List[int] = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(document))
+        document += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref_offset = len(document)
+    document += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        document += b"%010d 00000 n \n" % offset
+    document += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(document)
+
+
+def _matrix_banner(top: float, columns: int, title: str) -> List[str]:
+    bottom = top - _ROW_HEIGHT
+    return [
+        f"{_MARGIN} {bottom:.2f} {columns * _CELL_WIDTH} {_ROW_HEIGHT} re S",
+        _pdf_text(_MARGIN + 2, bottom + 3.5, title),
+    ]
+
+
+def _matrix_row(top: float, cells: Sequence[str]) -> List[str]:
+    bottom = top - _ROW_HEIGHT
+    operations: List[str] = []
+    for index, cell in enumerate(cells):
+        left = _MARGIN + index * _CELL_WIDTH
+        operations.append(f"{left} {bottom:.2f} {_CELL_WIDTH} {_ROW_HEIGHT} re S")
+        if cell:
+            operations.append(_pdf_text(left + 1.5, bottom + 3.5, cell))
+    return operations
+
+
+def _matrix_cells(rng: random.Random, month: int, columns: int, fill: float) -> Tuple[List[str], int]:
+    cells = [_month_label(month)] + [""] * (columns - 1)
+    amounts = 0
+    for index in range(3, columns):
+        if index in MATRIX_TABLE_COLUMNS:
+            if rng.random() < fill:
+                cells[index] = str(rng.randint(8, 80))
+                amounts += 1
+        elif rng.random() < 0.5:
+            cells[index] = f"{rng.uniform(0, 40):.1f}"
+    return cells, amounts
+
+
+def matrix_pdf(rng: random.Random, year: int, quarter: int, size: int) -> Tuple[bytes, int]:
+    columns = max(MATRIX_TABLE_COLUMNS) + 1
+    top_of_page = _LANDSCAPE[1] - _MARGIN
+    month = _first_auction_month(year, quarter)
+    expected = 0
+    pages: List[str] = []
+    for page_number in range(size):
+        top = top_of_page
+        operations: List[str] = []
+        if page_number == 0:
+            operations.extend(_matrix_banner(top, columns, "Recommendations for this Refunding ($ billions)"))
+            top -= _ROW_HEIGHT
+        for _ in range(_MATRIX_ROWS_PER_PAGE):
+            cells, amounts = _matrix_cells(rng, month, columns, fill=0.85)
+            operations.extend(_matrix_row(top, cells))
+            expected += amounts
+            top -= _ROW_HEIGHT
+            month += 1
+        pages.append("\n".join(operations))
+
+    # The trailing sections sit in the same table layout but must not be read as recommendations.
+    top = top_of_page
+    operations = []
+    for title in ("Provisional Indications for Next Refunding", "Historical Reference"):
+        operations.extend(_matrix_banner(top, columns, title))
+        top -= _ROW_HEIGHT
+        for offset in range(6):
+            cells, _ = _matrix_cells(rng, month + offset, columns, fill=1.0)
+            operations.extend(_matrix_row(top, cells))
+            top -= _ROW_HEIGHT
+        top -= _ROW_HEIGHT
+    pages.append("\n".join(operations))
+    return build_pdf(pages, _LANDSCAPE), expected
+
+
+def regex_pdf(rng: random.Random, year: int, quarter: int, size: int) -> Tuple[bytes, int]:
+    first_month = _first_auction_month(year, quarter) % 12 + 1
+    expected = 0
+    pages: List[str] = []
+    for page_number in range(size):
+        lines: List[str] = []
+        if page_number == 0:
+            lines.append("Recommendations for this Refunding ($ billions)")
+            lines.append(f"Net bills issuance {rng.uniform(0, 150):.2f}")
+            expected += 1
+        while len(lines) < _TEXT_LINES_PER_PAGE:
+            security = rng.choice(_FALLBACK_SECURITIES)
+            month = (first_month - 1 + rng.randrange(3)) % 12 + 1
+            offered = rng.uniform(10, 90)
+            amounts = [offered, rng.uniform(5, offered)]
+            if rng.random() < 0.5:
+                amounts.append(offered - amounts[1])
+            numbers = "  ".join(f"{amount:.2f}" for amount in amounts)
+            lines.append(f"{security}  {month}/{rng.randint(1, 28)}  {numbers}")
+            expected += 1
+        top = _PORTRAIT[1] - _MARGIN
+        pages.append(
+            "\n".join(_pdf_text(_MARGIN, top - index * _TEXT_LINE_HEIGHT, line) for index, line in enumerate(lines))
+        )
+    return build_pdf(pages, _PORTRAIT), expected
+
+
+def _announcement_date(year: int, quarter: int) -> str:
+    return f"{year}-{3 * (quarter - 1) + 2:02d}-01"
+
+
+def official_html(rng: random.Random, year: int, quarter: int, size: int) -> Tuple[bytes, int]:
+    month = _first_auction_month(year, quarter) - 3
+    rows = _OFFICIAL_ROWS_PER_SIZE * size
+    expected = 0
+    body_rows: List[str] = []
+    for offset in range(rows):
+        label = _month_label(month + offset)
+        header = f"<strong>{label}</strong>" if offset >= rows - 3 else label
+        cells: List[str] = []
+        for _ in _OFFICIAL_HEADERS:
+            if rng.random() < 0.9:
+                cells.append(f"<td>{rng.randint(8, 80)}</td>")
+                expected += 1
+            else:
+                cells.append("<td></td>")
+        body_rows.append(f"<tr><th>{header}</th>{''.join(cells)}</tr>")
+    headers = "".join(f"<th>{header}</th>" for header in _OFFICIAL_HEADERS)
+    padding = "".join(
+        f'<li><a href="/news/press-releases/sb{index:04d}">Related press release {index}</a></li>'
+        for index in range(_OFFICIAL_PADDING_LINKS)
+    )
+    html = (
+        "<!DOCTYPE html><html><head><title>Quarterly Refunding Statement</title></head><body>"
+        f'<nav><ul class="menu">{padding}</ul></nav><main><article>'
+        '<div class="field field--name-field-news-publication-date">'
+        f'<time class="datetime" datetime="{_announcement_date(year, quarter)}T12:30:00Z">announced</time></div>'
+        '<div class="field field--name-field-news-body"><p>Treasury anticipates the following auction sizes.</p>'
+        '<table class="usa-table">'
+        f"<thead><tr><th> </th>{headers}</tr></thead><tbody>{''.join(body_rows)}</tbody></table></div>"
+        "</article></main><footer>Treasury</footer></body></html>"
+    )
+    return html.encode("utf-8"), expected
+
+
+GENERATORS: Dict[str, Callable[[random.Random, int, int, int], Tuple[bytes, int]]] = {
+    "official": official_html,
+    "matrix": matrix_pdf,
+    "regex": regex_pdf,
+}
+
+
+def generate_corpus(
+    directory: str,
+    documents_per_size: int = DEFAULT_DOCUMENTS_PER_SIZE,
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    seed: int = DEFAULT_SEED,
+    kinds: Sequence[str] = DOCUMENT_KINDS,
+) -> List[CorpusDocument]:
+    unknown = set(kinds) - set(GENERATORS)
+    if unknown:
+        raise ValueError(f"Unknown document kinds: {', '.join(sorted(unknown))}")
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    documents: List[CorpusDocument] = []
+    for kind in kinds:
+        for size in sizes:
+            for index in range(documents_per_size):
+                year, quarter = rng.randint(2001, 2030), rng.randint(1, 4)
+                body, expected = GENERATORS[kind](rng, year, quarter, size)
+                name = f"{kind}_{size:03d}_{index:04d}.{'html' if kind == 'official' else 'pdf'}"
+                path = os.path.join(directory, name)
+                with open(path, "wb") as handle:
+                    handle.write(body)
+                documents.append(
+                    CorpusDocument(
+                        name,
+                        kind,
+                        size,
+                        year,
+                        quarter,
+                        _announcement_date(year, quarter),
+                        expected,
+                        os.path.abspath(path),
+                        hashlib.sha256(body).hexdigest(),
+                        len(body),
+                    )
+                )
+    with open(os.path.join(directory, CORPUS_MANIFEST), "w", encoding="utf-8") as handle:
+        json.dump([document._asdict() for document in documents], handle, indent=2)
+    return documents
+
+
+def load_corpus(directory: str) -> List[CorpusDocument]:
+    with open(os.path.join(directory, CORPUS_MANIFEST), encoding="utf-8") as handle:
+        return [CorpusDocument(**values) for values in json.load(handle)]
+
+
+def parse_corpus_document(document: CorpusDocument) -> int:
+    stored = StoredDocument(document.path, document.sha256, document.size_bytes)
+    if document.kind == "official":
+        return len(parse_official_article(stored, document.year, document.quarter)[1])
+    return len(parse_recommended_pdf(stored, document.quarter, document.year, document.announcement_date))
+
+
+def _peak_rss_kib() -> Optional[int]:
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _measure(kind: str, size: int, documents: Sequence[CorpusDocument]) -> ThroughputResult:
+    rows = 0
+    mismatches = 0
+    start = time.perf_counter()
+    for document in documents:
+        parsed = parse_corpus_document(document)
+        rows += parsed
+        mismatches += parsed != document.expected_rows
+    return ThroughputResult(
+        PARSER_LABELS[kind], size, len(documents), rows, mismatches, time.perf_counter() - start, _peak_rss_kib()
+    )
+
+
+def measure_throughput(documents: Sequence[CorpusDocument], isolated: bool = True) -> List[ThroughputResult]:
+    groups: Dict[Tuple[str, int], List[CorpusDocument]] = {}
+    for document in documents:
+        groups.setdefault((document.kind, document.size), []).append(document)
+    results: List[ThroughputResult] = []
+    for (kind, size), group in sorted(groups.items(), key=lambda item: (DOCUMENT_KINDS.index(item[0][0]), item[0][1])):
+        if not isolated:
+            results.append(_measure(kind, size, group))
+            continue
+        # A fresh interpreter per parser and size keeps each peak RSS figure attributable to that group alone.
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results.append(pool.submit(_measure, kind, size, group).result())
+    return results
+
+
+def format_results(results: Sequence[ThroughputResult]) -> str:
+    lines = [
+        f"{'parser':<40} {'size':>5} {'docs':>6} {'rows':>8} {'docs/s':>9} {'rows/s':>10} "
+        f"{'peak RSS MiB':>13} {'mismatches':>11}"
+    ]
+    for result in results:
+        peak = f"{result.peak_rss_kib / 1024:.1f}" if result.peak_rss_kib is not None else "n/a"
+        lines.append(
+            f"{result.parser:<40} {result.size:>5} {result.documents:>6} {result.rows:>8} "
+            f"{result.documents_per_second:>9.2f} {result.rows_per_second:>10.1f} {peak:>13} {result.mismatches:>11}"
+        )
+    return "\n".join(lines)
+
+
+def result_to_json(result: ThroughputResult) -> Dict[str, object]:
+    return {
+        **result._asdict(),
+        "documents_per_second": result.documents_per_second,
+        "rows_per_second": result.rows_per_second,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic TBAC document corpus and measure parser throughput over it."
+    )
+    parser.add_argument("--corpus", required=True, help="Directory holding the generated documents")
+    parser.add_argument(
+        "--documents", type=int, default=DEFAULT_DOCUMENTS_PER_SIZE, help="Documents per parser and size"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=lambda value: [int(size) for size in value.split(",")],
+        default=list(DEFAULT_SIZES),
+        help="Comma-separated document sizes (PDF pages, or multiples of 12 table rows for HTML)",
+    )
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Random seed of the generator")
+    parser.add_argument(
+        "--kinds", type=lambda value: value.split(","), default=list(DOCUMENT_KINDS), help="Document kinds to include"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("generate", help="Write the synthetic corpus and its manifest")
+    throughput_parser = subparsers.add_parser(
+        "throughput", help="Report documents/sec, rows/sec and peak RSS per parser (generates the corpus if missing)"
+    )
+    throughput_parser.add_argument("--json", default=None, help="Also write the results as JSON to this path")
+    throughput_parser.add_argument(
+        "--in-process", action="store_true", help="Measure in this process (peak RSS is then cumulative)"
+    )
+
+    args = parser.parse_args(argv)
+    if args.documents < 1 or any(size < 1 for size in args.sizes):
+        parser.error("--documents and --sizes must be at least 1")
+    try:
+        if args.command == "generate" or not os.path.exists(os.path.join(args.corpus, CORPUS_MANIFEST)):
+            documents = generate_corpus(args.corpus, args.documents, args.sizes, args.seed, args.kinds)
+            print(f"Wrote {len(documents)} documents to {args.corpus}")
+        else:
+            documents = load_corpus(args.corpus)
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.command == "generate":
+        return
+
+    results = measure_throughput(documents, isolated=not args.in_process)
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump([result_to_json(result) for result in results], handle, indent=2)
+    if any(result.mismatches for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
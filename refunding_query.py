@@ -0,0 +1,368 @@
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from collect_refunding_data import (
+    CSV_FIELDNAMES,
+    PARQUET_REQUIREMENT,
+    READERS,
+    DataType,
+    RefundingRow,
+    SecurityType,
+    parquet_available,
+)
+
+DEFAULT_DATA_PATH = "refunding_data.csv"
+DEFAULT_CHECK_INTERVAL = 1.0
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+RESULT_CACHE_SIZE = 4096
+PIVOT_COLUMNS = ("Data_type", "Quarter_year")
+
+_FORMATS_BY_EXTENSION = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".sqlite": "sqlite",
+    ".sqlite3": "sqlite",
+    ".db": "sqlite",
+}
+
+SecurityKey = Tuple[SecurityType, Optional[float]]
+
+
+def detect_format(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in _FORMATS_BY_EXTENSION:
+        raise ValueError(f"Cannot tell the format of {path}; expected one of {', '.join(_FORMATS_BY_EXTENSION)}")
+    return _FORMATS_BY_EXTENSION[extension]
+
+
+def _add(index: Dict[object, List[RefundingRow]], key: object, row: RefundingRow) -> None:
+    bucket = index.get(key)
+    if bucket is None:
+        index[key] = [row]
+    else:
+        bucket.append(row)
+
+
+class _QuarterSegment:
+    def __init__(self, rows: Tuple[RefundingRow, ...]) -> None:
+        self.rows = rows
+        self.by_security: Dict[SecurityKey, List[RefundingRow]] = {}
+        self.by_month: Dict[str, List[RefundingRow]] = {}
+        self.by_data_type: Dict[DataType, List[RefundingRow]] = {}
+        for row in rows:
+            _add(self.by_security, (row.Security_type, row.Maturity), row)
+            _add(self.by_month, row.Auction_month, row)
+            _add(self.by_data_type, row.Data_type, row)
+
+    def select(
+        self,
+        security_type: Optional[SecurityType],
+        maturity: Optional[float],
+        auction_month: Optional[str],
+        data_type: Optional[DataType],
+    ) -> List[RefundingRow]:
+        # Start from the smallest posting list among the indexed predicates, then filter the rest row by row.
+        candidates: List[List[RefundingRow]] = []
+        if security_type is not None and maturity is not None:
+            candidates.append(self.by_security.get((security_type, maturity), []))
+        elif security_type is not None:
+            candidates.append(
+                [row for key, rows in self.by_security.items() if key[0] is security_type for row in rows]
+            )
+        if auction_month is not None:
+            candidates.append(self.by_month.get(auction_month, []))
+        if data_type is not None:
+            candidates.append(self.by_data_type.get(data_type, []))
+        rows = min(candidates, key=len) if candidates else self.rows
+        return [
+            row
+            for row in rows
+            if (security_type is None or row.Security_type is security_type)
+            and (maturity is None or row.Maturity == maturity)
+            and (auction_month is None or row.Auction_month == auction_month)
+            and (data_type is None or row.Data_type is data_type)
+        ]
+
+
+class _IndexState(NamedTuple):
+    segments: Dict[str, _QuarterSegment]
+    results: Dict[Tuple[object, ...], object]
+
+
+class RefundingIndex:
+    def __init__(
+        self, path: str, data_format: Optional[str] = None, check_interval: float = DEFAULT_CHECK_INTERVAL
+    ) -> None:
+        self.path = path
+        self.data_format = data_format or detect_format(path)
+        if self.data_format not in READERS:
+            raise ValueError(f"Unsupported data format: {self.data_format}")
+        if self.data_format == "parquet" and not parquet_available():
+            raise ValueError(PARQUET_REQUIREMENT)
+        self.check_interval = check_interval
+        self.reloads = 0
+        self.last_reload: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._signature: Optional[Tuple[int, int, int]] = None
+        self._checked_at = 0.0
+        self._state = _IndexState({}, {})
+        self.refresh()
+
+    def refresh(self) -> bool:
+        with self._lock:
+            self._checked_at = time.monotonic()
+            stat = os.stat(self.path)
+            signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            if signature == self._signature:
+                return False
+            grouped: Dict[str, List[RefundingRow]] = {}
+            for row in READERS[self.data_format](self.path):
+                _add(grouped, row.Quarter_year, row)
+            previous = self._state.segments
+            segments: Dict[str, _QuarterSegment] = {}
+            reused = 0
+            for quarter_label, rows in grouped.items():
+                segment = previous.get(quarter_label)
+                if segment is not None and segment.rows == tuple(rows):
+                    reused += 1
+                else:
+                    segment = _QuarterSegment(tuple(rows))
+                segments[quarter_label] = segment
+            self.last_reload = {
+                "reused": reused,
+                "rebuilt": len(segments) - reused,
+                "dropped": len(set(previous) - set(segments)),
+            }
+            self._state = _IndexState(segments, {})
+            self._signature = signature
+            self.reloads += 1
+            return True
+
+    def _current(self) -> _IndexState:
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self.refresh()
+        return self._state
+
+    @staticmethod
+    def _remember(state: _IndexState, key: Tuple[object, ...], value: object) -> None:
+        if len(state.results) >= RESULT_CACHE_SIZE:
+            state.results.clear()
+        state.results[key] = value
+
+    def quarters(self) -> List[str]:
+        return list(self._current().segments)
+
+    def securities(self) -> List[SecurityKey]:
+        keys = {key for segment in self._current().segments.values() for key in segment.by_security}
+        return sorted(keys, key=lambda key: (key[0].value, key[1] is None, key[1] or 0.0))
+
+    def rows(
+        self,
+        security_type: Optional[str] = None,
+        maturity: Optional[float] = None,
+        auction_month: Optional[str] = None,
+        quarter: Optional[str] = None,
+        data_type: Optional[str] = None,
+    ) -> List[RefundingRow]:
+        state = self._current()
+        security = SecurityType(security_type) if security_type is not None else None
+        kind = DataType(data_type) if data_type is not None else None
+        maturity = float(maturity) if maturity is not None else None
+        key = ("rows", security, maturity, auction_month, quarter, kind)
+        cached = state.results.get(key)
+        if cached is None:
+            if quarter is not None:
+                segments: Iterable[_QuarterSegment] = [state.segments[quarter]] if quarter in state.segments else []
+            else:
+                segments = state.segments.values()
+            cached = [row for segment in segments for row in segment.select(security, maturity, auction_month, kind)]
+            self._remember(state, key, cached)
+        return list(cached)
+
+    def series(
+        self, security_type: str, maturity: Optional[float] = None, data_type: Optional[str] = None
+    ) -> List[RefundingRow]:
+        state = self._current()
+        key = ("series", security_type, maturity, data_type)
+        cached = state.results.get(key)
+        if cached is None:
+            cached = sorted(
+                self.rows(security_type, maturity, data_type=data_type),
+                key=lambda row: (row.Auction_month, row.Date, row.Quarter_year),
+            )
+            self._remember(state, key, cached)
+        return list(cached)
+
+    def pivot(
+        self, security_type: str, maturity: Optional[float] = None, columns: str = "Data_type"
+    ) -> Dict[str, Dict[str, float]]:
+        if columns not in PIVOT_COLUMNS:
+            raise ValueError(f"Pivot columns must be one of {', '.join(PIVOT_COLUMNS)}")
+        state = self._current()
+        key = ("pivot", security_type, maturity, columns)
+        cached = state.results.get(key)
+        if cached is None:
+            # Rows come out oldest announcement first, so the latest announcement wins when a cell repeats.
+            cached = {}
+            for row in self.series(security_type, maturity):
+                cached.setdefault(row.Auction_month, {})[str(getattr(row, columns))] = row.Offered_amount
+            self._remember(state, key, cached)
+        return {month: dict(cells) for month, cells in cached.items()}
+
+
+def row_to_json(row: RefundingRow) -> Dict[str, object]:
+    return dict(zip(CSV_FIELDNAMES, row.sql_values()))
+
+
+def _first(params: Dict[str, List[str]], name: str) -> Optional[str]:
+    values = params.get(name)
+    return values[0] if values else None
+
+
+def _maturity(params: Dict[str, List[str]]) -> Optional[float]:
+    value = _first(params, "maturity")
+    return float(value) if value not in (None, "") else None
+
+
+def _answer(index: RefundingIndex, route: str, params: Dict[str, List[str]]) -> object:
+    if route == "/quarters":
+        return index.quarters()
+    if route == "/securities":
+        return [{"Security_type": security.value, "Maturity": maturity} for security, maturity in index.securities()]
+    if route == "/rows":
+        rows = index.rows(
+            _first(params, "security"),
+            _maturity(params),
+            _first(params, "month"),
+            _first(params, "quarter"),
+            _first(params, "data_type"),
+        )
+        return [row_to_json(row) for row in rows]
+    if route == "/series":
+        security = _first(params, "security")
+        if security is None:
+            raise ValueError("The security parameter is required")
+        return [row_to_json(row) for row in index.series(security, _maturity(params), _first(params, "data_type"))]
+    if route == "/pivot":
+        security = _first(params, "security")
+        if security is None:
+            raise ValueError("The security parameter is required")
+        return index.pivot(security, _maturity(params), _first(params, "columns") or "Data_type")
+    raise LookupError(route)
+
+
+def make_server(index: RefundingIndex, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            url = urlparse(self.path)
+            try:
+                status, payload = 200, _answer(index, url.path, parse_qs(url.query))
+            except LookupError:
+                status, payload = 404, {"error": f"Unknown endpoint {url.path}"}
+            except ValueError as exc:
+                status, payload = 400, {"error": str(exc)}
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: object) -> None:
+            return None
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Query collected quarterly refunding data through in-memory indexes.")
+    parser.add_argument("--data", default=DEFAULT_DATA_PATH, help="Collector output file (CSV, Parquet or SQLite)")
+    parser.add_argument(
+        "--data-format",
+        choices=sorted(READERS),
+        default=None,
+        help="Format of the data file (detected from its extension by default)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rows_parser = subparsers.add_parser("rows", help="Print rows matching every given filter")
+    rows_parser.add_argument("--security", default=None, help="Security type, e.g. NOTE or BILL")
+    rows_parser.add_argument("--maturity", type=float, default=None, help="Maturity value, e.g. 2 for a 2-Year Note")
+    rows_parser.add_argument("--month", default=None, help="Auction month as YYYY-MM")
+    rows_parser.add_argument("--quarter", default=None, help='Quarter label, e.g. "Q3 2025"')
+    rows_parser.add_argument("--data-type", default=None, help="Data_type value to keep")
+
+    series_parser = subparsers.add_parser("series", help="Print a security's offered amounts ordered by auction month")
+    series_parser.add_argument("--security", required=True, help="Security type, e.g. NOTE")
+    series_parser.add_argument("--maturity", type=float, default=None, help="Maturity value")
+    series_parser.add_argument("--data-type", default=None, help="Data_type value to keep")
+
+    pivot_parser = subparsers.add_parser("pivot", help="Print offered amounts by auction month and a second column")
+    pivot_parser.add_argument("--security", required=True, help="Security type, e.g. NOTE")
+    pivot_parser.add_argument("--maturity", type=float, default=None, help="Maturity value")
+    pivot_parser.add_argument("--columns", choices=PIVOT_COLUMNS, default="Data_type", help="Pivot column")
+
+    analyze_parser = subparsers.add_parser(
+        "analyze", help="Compare recommendations, indications and actuals with NumPy (requires numpy)"
+    )
+    analyze_parser.add_argument(
+        "report",
+        help="deltas (actual vs recommended/indicated per auction month), "
+        "qoq (quarter-over-quarter change per security) or coupon-totals (coupon issuance per refunding quarter)",
+    )
+    analyze_parser.add_argument("--security", default=None, help="Restrict to one security type, e.g. NOTE")
+    analyze_parser.add_argument("--maturity", type=float, default=None, help="Restrict to one maturity value")
+
+    serve_parser = subparsers.add_parser("serve", help="Answer the same queries over a local HTTP/JSON service")
+    serve_parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to listen on")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to listen on")
+
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.data):
+        parser.error(f"{args.data} does not exist; run collect_refunding_data.py first")
+    try:
+        index = RefundingIndex(args.data, args.data_format)
+        if args.command == "rows":
+            result: object = [
+                row_to_json(row)
+                for row in index.rows(args.security, args.maturity, args.month, args.quarter, args.data_type)
+            ]
+        elif args.command == "series":
+            result = [row_to_json(row) for row in index.series(args.security, args.maturity, args.data_type)]
+        elif args.command == "pivot":
+            result = index.pivot(args.security, args.maturity, args.columns)
+        elif args.command == "analyze":
+            try:
+                import refunding_analytics
+            except ImportError:
+                parser.error("The analyze command requires numpy (pip install -r requirements-optional.txt)")
+            if args.report not in refunding_analytics.REPORTS:
+                parser.error(f"Unknown report {args.report}; choose from {', '.join(refunding_analytics.REPORTS)}")
+            arrays = refunding_analytics.build_arrays(index.rows(args.security, args.maturity))
+            result = refunding_analytics.REPORTS[args.report](arrays)
+        else:
+            server = make_server(index, args.host, args.port)
+            print(f"Serving {args.data} on http://{args.host}:{server.server_address[1]}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.server_close()
+            return
+    except ValueError as exc:
+        parser.error(str(exc))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
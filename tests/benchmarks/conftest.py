@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+import pytest
+
+
+class BenchmarkRecorder:
+    def __init__(self, baseline: Dict[str, Dict[str, float]], threshold: float) -> None:
+        self.baseline = baseline
+        self.threshold = threshold
+        self.results: Dict[str, Dict[str, float]] = {}
+
+    def measure(self, name: str, func: Callable[[], object], rounds: int = 5, calls: int = 1) -> Dict[str, float]:
+        func()
+        timings = []
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(rounds):
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result = {
+            "rounds": rounds,
+            "min_s": min(timings),
+            "median_s": statistics.median(timings),
+            "peak_kib": peak / 1024,
+        }
+        if calls > 1:
+            # Micro-benchmarks run a helper many times per round; report the cost of a single call too.
+            result["min_ns_per_call"] = min(timings) * 1e9 / calls
+        self.results[name] = result
+        return result
+
+    def speedup(self, name: str, reference: str) -> float:
+        # Stored with the result, so the report shows the gain over the reference implementation.
+        ratio = self.results[reference]["min_s"] / self.results[name]["min_s"]
+        self.results[name][f"speedup_vs_{reference}"] = ratio
+        return ratio
+
+    def regression(self, name: str) -> Optional[str]:
+        reference = self.baseline.get(name)
+        if reference is None:
+            return None
+        # The fastest round is the least sensitive to scheduler noise.
+        current = self.results[name]["min_s"]
+        allowed = reference["min_s"] * (1 + self.threshold)
+        if current > allowed:
+            return (
+                f"{name} took {current * 1000:.2f} ms, baseline {reference['min_s'] * 1000:.2f} ms "
+                f"(threshold {self.threshold:.0%})"
+            )
+        return None
+
+
+@pytest.fixture(autouse=True)
+def _require_benchmark_flag(request: pytest.FixtureRequest) -> None:
+    if not request.config.getoption("--benchmark"):
+        pytest.skip("parser benchmarks only run with --benchmark")
+
+
+@pytest.fixture(scope="session")
+def benchmark_recorder(request: pytest.FixtureRequest) -> Iterator[BenchmarkRecorder]:
+    baseline: Dict[str, Dict[str, float]] = {}
+    baseline_path = request.config.getoption("--benchmark-baseline")
+    if baseline_path:
+        baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))["results"]
+    recorder = BenchmarkRecorder(baseline, request.config.getoption("--benchmark-threshold"))
+    yield recorder
+    # Skipped or deselected benchmarks must not overwrite an earlier report with an empty one.
+    if not request.config.getoption("--benchmark") or not recorder.results:
+        return
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": recorder.results,
+    }
+    output = Path(request.config.getoption("--benchmark-output"))
+    output.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Callable, List
+
+import classification_baseline
+import pytest
+from bs4 import BeautifulSoup
+
+from collect_refunding_data import _quarter_from_label, categorize_security, ordinal_to_int, parse_maturity
+
+
+@pytest.fixture(scope="module")
+def fixture_labels(official_html_loader, index_html_loader) -> List[str]:
+    labels: List[str] = []
+    documents = [official_html_loader("Q3 2025"), official_html_loader("Q2 2025")]
+    documents += [index_html_loader("official"), index_html_loader("recommended")]
+    for document in documents:
+        soup = BeautifulSoup(document, "lxml")
+        for cell in soup.find_all(["th", "td", "a"]):
+            labels.append(cell.get("aria-label") or cell.get_text(" ", strip=True))
+    return labels
+
+
+@pytest.mark.parametrize(
+    "name,helper,baseline",
+    [
+        ("ordinal_to_int", ordinal_to_int, classification_baseline.ordinal_to_int),
+        ("_quarter_from_label", _quarter_from_label, classification_baseline.quarter_from_label),
+        ("parse_maturity", parse_maturity, classification_baseline.parse_maturity),
+        ("categorize_security", categorize_security, classification_baseline.categorize_security),
+    ],
+)
+def test_benchmark_classification_helpers(
+    name: str,
+    helper: Callable[[str], object],
+    baseline: Callable[[str], object],
+    fixture_labels: List[str],
+    benchmark_recorder,
+) -> None:
+    # Memoized helpers are timed through __wrapped__, so the regexes run on every call instead of cache lookups.
+    uncached = getattr(helper, "__wrapped__", helper)
+    assert [uncached(label) for label in fixture_labels] == [baseline(label) for label in fixture_labels]
+
+    def run(func: Callable[[str], object]) -> Callable[[], None]:
+        return lambda: [func(label) for label in fixture_labels]
+
+    calls = len(fixture_labels)
+    benchmark_recorder.measure(f"classification_baseline[{name}]", run(baseline), rounds=20, calls=calls)
+    benchmark_recorder.measure(f"classification[{name}]", run(uncached), rounds=20, calls=calls)
+    benchmark_recorder.speedup(f"classification[{name}]", f"classification_baseline[{name}]")
+    if uncached is not helper:
+        benchmark_recorder.measure(f"classification_memoized[{name}]", run(helper), rounds=20, calls=calls)
+        benchmark_recorder.speedup(f"classification_memoized[{name}]", f"classification_baseline[{name}]")
+    assert not benchmark_recorder.regression(f"classification[{name}]")
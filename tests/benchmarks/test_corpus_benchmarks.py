@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from collect_refunding_data import parse_official_article, parse_recommended_pdf
+from refunding_corpus import matrix_pdf, official_html, regex_pdf
+
+SIZES = [1, 2, 4]
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_benchmark_synthetic_official_article(size: int, benchmark_recorder) -> None:
+    body, _ = official_html(random.Random(size), 2024, 3, size)
+    name = f"synthetic_official_article[{size}]"
+    benchmark_recorder.measure(name, lambda: parse_official_article(body, 2024, 3), rounds=5)
+    assert not benchmark_recorder.regression(name)
+
+
+@pytest.mark.parametrize("generator", [matrix_pdf, regex_pdf], ids=["matrix", "regex_fallback"])
+@pytest.mark.parametrize("size", SIZES)
+def test_benchmark_synthetic_recommended_pdf(generator, size: int, benchmark_recorder) -> None:
+    body, _ = generator(random.Random(size), 2024, 3, size)
+    name = f"synthetic_recommended_pdf[{generator.__name__}-{size}]"
+    benchmark_recorder.measure(name, lambda: parse_recommended_pdf(body, 3, 2024, "2024-08-01"), rounds=1)
+    assert not benchmark_recorder.regression(name)
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import io
+import re
+
+import pdfplumber
+import pytest
+from bs4 import BeautifulSoup
+
+from collect_refunding_data import (
+    _parse_matrix_recommended_pages,
+    _parse_quarter_link_table,
+    _parse_quarter_links,
+    _quarter_table_strainer,
+    parse_official_article,
+    parse_recommended_pdf,
+)
+
+LABELS = ["Q3 2025", "Q2 2025"]
+
+
+def _quarter_and_year(label: str) -> tuple[int, int]:
+    quarter, year = label.split()
+    return int(quarter[1:]), int(year)
+
+
+@pytest.mark.parametrize("label", LABELS)
+def test_benchmark_parse_official_article(label: str, official_html_loader, benchmark_recorder) -> None:
+    html = official_html_loader(label)
+    quarter, year = _quarter_and_year(label)
+    benchmark_recorder.measure(
+        f"parse_official_article[{label}]", lambda: parse_official_article(html, year, quarter), rounds=10
+    )
+    assert not benchmark_recorder.regression(f"parse_official_article[{label}]")
+
+
+@pytest.mark.parametrize("label", LABELS)
+def test_benchmark_parse_recommended_pdf(label: str, recommended_pdf_loader, benchmark_recorder) -> None:
+    pdf_bytes = recommended_pdf_loader(label)
+    quarter, year = _quarter_and_year(label)
+    benchmark_recorder.measure(
+        f"parse_recommended_pdf[{label}]",
+        lambda: parse_recommended_pdf(pdf_bytes, quarter, year, "2025-01-01"),
+        rounds=3,
+    )
+    assert not benchmark_recorder.regression(f"parse_recommended_pdf[{label}]")
+
+
+@pytest.mark.parametrize("label", LABELS)
+def test_benchmark_parse_matrix_recommended_pages(label: str, recommended_pdf_loader, benchmark_recorder) -> None:
+    pdf_bytes = recommended_pdf_loader(label)
+
+    def run() -> None:
+        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+            _parse_matrix_recommended_pages(pdf.pages, label, "2025-01-01")
+
+    benchmark_recorder.measure(f"_parse_matrix_recommended_pages[{label}]", run, rounds=3)
+    assert not benchmark_recorder.regression(f"_parse_matrix_recommended_pages[{label}]")
+
+
+@pytest.mark.parametrize("name", ["official", "recommended"])
+def test_benchmark_parse_quarter_link_table(name: str, index_html_loader, benchmark_recorder) -> None:
+    soup = BeautifulSoup(index_html_loader(name), "lxml")
+    table = soup.find("table", attrs={"aria-label": re.compile(r"Quarter", re.I)})
+    benchmark_recorder.measure(
+        f"_parse_quarter_link_table[{name}]", lambda: _parse_quarter_link_table(table), rounds=20
+    )
+    assert not benchmark_recorder.regression(f"_parse_quarter_link_table[{name}]")
+
+
+@pytest.mark.parametrize("name", ["official", "recommended"])
+def test_benchmark_parse_quarter_index(name: str, index_html_loader, benchmark_recorder) -> None:
+    document = index_html_loader(name)
+    benchmark_recorder.measure(
+        f"parse_quarter_index[{name}]",
+        lambda: _parse_quarter_links(BeautifulSoup(document, "lxml", parse_only=_quarter_table_strainer())),
+        rounds=10,
+    )
+    assert not benchmark_recorder.regression(f"parse_quarter_index[{name}]")
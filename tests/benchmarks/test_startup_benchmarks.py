@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+
+
+def _run_python(*args: str) -> None:
+    subprocess.run([sys.executable, *args], cwd=ROOT, check=True, capture_output=True)
+
+
+def test_benchmark_cold_import(benchmark_recorder) -> None:
+    benchmark_recorder.measure(
+        "cold_start[import]", lambda: _run_python("-c", "import collect_refunding_data"), rounds=5
+    )
+    assert not benchmark_recorder.regression("cold_start[import]")
+
+
+def test_benchmark_cold_check(index_cache_dir: Path, tmp_path: Path, benchmark_recorder) -> None:
+    command = (
+        "collect_refunding_data.py",
+        "check",
+        "--offline",
+        "--cache-dir",
+        str(index_cache_dir),
+        "--output",
+        str(tmp_path / "missing.csv"),
+    )
+    benchmark_recorder.measure("cold_start[check]", lambda: _run_python(*command), rounds=5)
+    assert not benchmark_recorder.regression("cold_start[check]")
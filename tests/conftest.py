@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import threading
 from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Callable, Dict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 import pytest
 
+import collect_refunding_data
+
 
 FIXTURE_LABELS = (
     "Q3 2025",
@@ -13,6 +17,27 @@ FIXTURE_LABELS = (
 )
 
 
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("benchmark", "parser benchmarks (tests/benchmarks)")
+    group.addoption("--benchmark", action="store_true", help="Run the parser benchmarks instead of skipping them")
+    group.addoption(
+        "--benchmark-output",
+        default="bench_output.json",
+        help="JSON file receiving the benchmark results",
+    )
+    group.addoption(
+        "--benchmark-baseline",
+        default=None,
+        help="JSON results of an earlier run to compare against",
+    )
+    group.addoption(
+        "--benchmark-threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown against the baseline before a benchmark fails",
+    )
+
+
 @pytest.fixture(scope="session")
 def fixtures_dir() -> Path:
     return Path(__file__).parent / "fixtures"
@@ -49,6 +74,154 @@ def recommended_pdf_loader(fixtures_dir: Path) -> Callable[[str], bytes]:
     return _load
 
 
+@pytest.fixture(scope="session")
+def index_html_loader(fixtures_dir: Path) -> Callable[[str], str]:
+    @lru_cache(maxsize=None)
+    def _load(name: str) -> str:
+        path = fixtures_dir / f"{name}_index.html"
+        if not path.exists():
+            raise FileNotFoundError(f"Index page fixture not found for {name} at {path}")
+        return path.read_text(encoding="utf-8")
+
+    return _load
+
+
+@pytest.fixture
+def index_cache_dir(tmp_path: Path, index_html_loader: Callable[[str], str]) -> Path:
+    cache_dir = tmp_path / "cache"
+    cache = collect_refunding_data.HttpCache(str(cache_dir))
+    cache.put(collect_refunding_data.OFFICIAL_REMARKS_URL, index_html_loader("official").encode("utf-8"))
+    cache.put(collect_refunding_data.RECOMMENDED_TABLES_URL, index_html_loader("recommended").encode("utf-8"))
+    return cache_dir
+
+
 @pytest.fixture(scope="session")
 def sample_quarters(available_quarter_labels: tuple[str, ...]) -> tuple[str, ...]:
     return available_quarter_labels
+
+
+class FakeResponse:
+    def __init__(self, body: bytes) -> None:
+        self.status_code = 200
+        self.headers: Dict[str, str] = {}
+        self.content = body
+        self.text = body.decode("utf-8", errors="replace")
+
+    def raise_for_status(self) -> None:
+        return None
+
+
+class FakeSession:
+    def __init__(self, documents: Dict[str, bytes]) -> None:
+        self.documents = documents
+        self.requested: List[str] = []
+        self._lock = threading.Lock()
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 0) -> FakeResponse:
+        with self._lock:
+            self.requested.append(url)
+        return FakeResponse(self.documents[url])
+
+
+@pytest.fixture
+def fake_session_factory() -> Callable[[Dict[str, bytes]], FakeSession]:
+    return FakeSession
+
+
+@pytest.fixture
+def fake_treasury(
+    monkeypatch: pytest.MonkeyPatch,
+    official_html_loader: Callable[[str], str],
+    recommended_pdf_loader: Callable[[str], bytes],
+) -> FakeSession:
+    official_links: Dict[Tuple[int, int], str] = {}
+    recommended_links: Dict[Tuple[int, int], str] = {}
+    documents: Dict[str, bytes] = {}
+    for year, quarter in ((2025, 3), (2025, 2)):
+        label = f"Q{quarter} {year}"
+        official_url = f"https://example.test/official/{year}-q{quarter}"
+        recommended_url = f"https://example.test/recommended/{year}-q{quarter}.pdf"
+        official_links[(year, quarter)] = official_url
+        recommended_links[(year, quarter)] = recommended_url
+        documents[official_url] = official_html_loader(label).encode("utf-8")
+        documents[recommended_url] = recommended_pdf_loader(label)
+    monkeypatch.setattr(
+        collect_refunding_data, "extract_official_links", lambda session=None, cache=None, metrics=None: official_links
+    )
+    monkeypatch.setattr(
+        collect_refunding_data,
+        "extract_recommended_links",
+        lambda session=None, cache=None, metrics=None: recommended_links,
+    )
+    return FakeSession(documents)
+
+
+class StandInResponse:
+    def __init__(self, status: int = 200, body: bytes = b"", headers: Optional[Dict[str, str]] = None) -> None:
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+
+class StandInServer:
+    def __init__(self) -> None:
+        self.routes: Dict[str, List[StandInResponse]] = {}
+        self.requests: List[Tuple[str, int, Dict[str, str]]] = []
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self) -> None:
+                response = server._next_response(self.path, self.client_address[1], dict(self.headers))
+                self.send_response(response.status)
+                for name, value in response.headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(response.body)))
+                self.end_headers()
+                self.wfile.write(response.body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                return None
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def _next_response(self, path: str, client_port: int, headers: Dict[str, str]) -> StandInResponse:
+        with self._lock:
+            self.requests.append((path, client_port, headers))
+            script = self.routes.get(path)
+            if not script:
+                return StandInResponse(404, b"not found")
+            return script.pop(0) if len(script) > 1 else script[0]
+
+    def url(self, path: str) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{path}"
+
+    def route(self, path: str, *responses: StandInResponse) -> str:
+        with self._lock:
+            self.routes[path] = list(responses)
+        return self.url(path)
+
+    def hits(self, path: str) -> int:
+        with self._lock:
+            return sum(1 for requested, _, _ in self.requests if requested == path)
+
+
+@pytest.fixture
+def stand_in_server() -> Iterator[StandInServer]:
+    server = StandInServer()
+    server.thread.start()
+    try:
+        yield server
+    finally:
+        server.httpd.shutdown()
+        server.httpd.server_close()
+
+
+@pytest.fixture
+def stand_in_response() -> Callable[..., StandInResponse]:
+    return StandInResponse
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import json
+import math
+from collections import defaultdict
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from collect_refunding_data import DataType, RefundingRow, SecurityType, Units, collect_data, write_csv  # noqa: E402
+from refunding_analytics import (  # noqa: E402
+    ACTUAL,
+    LAYERS,
+    RECOMMENDED,
+    build_arrays,
+    coupon_issuance_totals,
+    coupon_total_records,
+    delta_records,
+    deltas,
+    quarter_over_quarter,
+    series_label,
+)
+from refunding_query import main as query_main  # noqa: E402
+
+
+@pytest.fixture
+def sample_entries(fake_treasury):
+    return collect_data(max_quarters=2, session=fake_treasury, parse_workers=1)
+
+
+def _row(date: str, security: SecurityType, maturity: float, month: str, amount: float, data_type: DataType):
+    return RefundingRow("Q3 2025", date, security, maturity, Units.YEARS, month, "", amount, data_type, "")
+
+
+def _latest_cells(rows):
+    latest = {}
+    for row in sorted(rows, key=lambda row: row.Date):
+        if row.Auction_month:
+            latest[(row.Data_type, row.Security_type, row.Maturity, row.Units, row.Auction_month)] = row.Offered_amount
+    return latest
+
+
+def test_build_arrays_matches_latest_value_per_cell(sample_entries) -> None:
+    arrays = build_arrays(sample_entries)
+    expected = _latest_cells(sample_entries)
+    assert np.count_nonzero(~np.isnan(arrays.values)) == len(expected)
+    for (data_type, security, maturity, units, month), amount in expected.items():
+        cell = arrays.values[
+            LAYERS.index(data_type), arrays.series.index((security, maturity, units)), arrays.months.index(month)
+        ]
+        assert cell == amount
+
+
+def test_build_arrays_prefers_the_most_recent_announcement() -> None:
+    rows = [
+        _row("2025-07-30", SecurityType.NOTE, 2.0, "2025-08", 69.0, DataType.HISTORICAL_REFERENCE),
+        _row("2025-04-30", SecurityType.NOTE, 2.0, "2025-08", 60.0, DataType.HISTORICAL_REFERENCE),
+        _row("2025-04-30", SecurityType.NOTE, 2.0, "2025-10", 58.0, DataType.RECOMMENDATION_FOR_THIS_REFUNDING),
+    ]
+    arrays = build_arrays(rows)
+    assert arrays.months == ["2025-08", "2025-09", "2025-10"]
+    assert arrays.values[ACTUAL, 0, 0] == 69.0
+    assert arrays.values[RECOMMENDED, 0, 2] == 58.0
+    assert math.isnan(arrays.values[RECOMMENDED, 0, 1])
+
+
+def test_deltas_match_a_loop_over_rows(sample_entries) -> None:
+    arrays = build_arrays(sample_entries)
+    differences = deltas(arrays)["actual_minus_recommended"]
+    latest = _latest_cells(sample_entries)
+    checked = 0
+    for (data_type, security, maturity, units, month), actual in latest.items():
+        if data_type is not DataType.HISTORICAL_REFERENCE:
+            continue
+        recommended = latest.get((DataType.RECOMMENDATION_FOR_THIS_REFUNDING, security, maturity, units, month))
+        value = differences[arrays.series.index((security, maturity, units)), arrays.months.index(month)]
+        if recommended is None:
+            assert math.isnan(value)
+        else:
+            assert value == pytest.approx(actual - recommended)
+            checked += 1
+    assert checked
+    assert {record["series"] for record in delta_records(arrays)} <= {series_label(key) for key in arrays.series}
+
+
+def test_quarter_over_quarter_groups_auction_months_by_refunding_quarter() -> None:
+    rows = [
+        _row("2025-04-30", SecurityType.NOTE, 2.0, month, amount, DataType.HISTORICAL_REFERENCE)
+        for month, amount in (("2025-01", 5.0), ("2025-02", 1.0), ("2025-03", 2.0), ("2025-05", 10.0))
+    ]
+    labels, totals, changes = quarter_over_quarter(build_arrays(rows))
+    assert labels == ["Q4 2024", "Q1 2025", "Q2 2025"]
+    assert totals[0].tolist() == [5.0, 3.0, 10.0]
+    assert math.isnan(changes[0, 0])
+    assert changes[0, 1:].tolist() == [-2.0, 7.0]
+
+
+def test_coupon_totals_exclude_bills(sample_entries) -> None:
+    arrays = build_arrays(sample_entries)
+    labels, totals = coupon_issuance_totals(arrays)
+    expected = defaultdict(float)
+    for (data_type, security, _, _, month), amount in _latest_cells(sample_entries).items():
+        if data_type is DataType.HISTORICAL_REFERENCE and security is not SecurityType.BILL:
+            expected[month] += amount
+    assert np.nansum(totals["actual"]) == pytest.approx(sum(expected.values()))
+    assert [record["quarter"] for record in coupon_total_records(arrays)] == labels
+
+
+def test_build_arrays_handles_no_rows() -> None:
+    arrays = build_arrays([])
+    assert arrays.series == [] and arrays.months == []
+    assert coupon_total_records(arrays) == []
+
+
+def test_analyze_command_prints_report(sample_entries, tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    path = tmp_path / "refunding_data.csv"
+    write_csv(sample_entries, str(path))
+    query_main(["--data", str(path), "analyze", "coupon-totals"])
+    assert json.loads(capsys.readouterr().out) == coupon_total_records(build_arrays(sample_entries))
+    with pytest.raises(SystemExit):
+        query_main(["--data", str(path), "analyze", "unknown"])
@@ -0,0 +1,347 @@
+from __future__ import annotations
+
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterator, List
+
+import pytest
+
+import collect_refunding_data
+from collect_refunding_data import (
+    NOTE_MATRIX_TABLE,
+    Checkpoint,
+    DataType,
+    HttpCache,
+    RefundingRow,
+    RunMetrics,
+    SecurityType,
+    StoredDocument,
+    Units,
+    collect_data,
+    consolidate_entries,
+    existing_quarters,
+    iter_collected_entries,
+    main,
+    merge_csv,
+    read_csv,
+    write_csv,
+)
+
+
+def test_collect_data_orders_rows_newest_quarter_first(fake_treasury) -> None:
+    entries = collect_data(max_quarters=2, concurrency=4, session=fake_treasury)
+    labels = [entry.Quarter_year for entry in entries]
+    assert labels == sorted(labels, key=lambda label: label != "Q3 2025")
+    assert {"Q3 2025", "Q2 2025"} == set(labels)
+    assert len(fake_treasury.requested) == 4
+
+
+def test_collect_data_output_does_not_depend_on_concurrency(fake_treasury) -> None:
+    sequential = collect_data(max_quarters=2, concurrency=1, session=fake_treasury)
+    concurrent = collect_data(max_quarters=2, concurrency=8, session=fake_treasury)
+    assert sequential == concurrent
+
+
+def test_collect_data_parses_pdfs_in_worker_processes(fake_treasury) -> None:
+    inline = collect_data(max_quarters=2, session=fake_treasury, parse_workers=1)
+    pooled = collect_data(max_quarters=2, session=fake_treasury, parse_workers=2)
+    assert pooled == inline
+    assert any(entry.Data_type == "RECOMMENDATION_FOR_THIS_REFUNDING" for entry in pooled)
+
+
+def test_cached_downloads_reach_the_parsers_as_file_paths(
+    fake_treasury, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    expected = collect_data(max_quarters=2, session=fake_treasury, parse_workers=1)
+    pooled = collect_data(max_quarters=2, session=fake_treasury, cache=HttpCache(str(tmp_path)), parse_workers=2)
+    assert pooled == expected
+
+    received = []
+    parse_recommended_pdf = collect_refunding_data.parse_recommended_pdf
+
+    def recording_parse(pdf_document, *args):
+        received.append(pdf_document)
+        return parse_recommended_pdf(pdf_document, *args)
+
+    monkeypatch.setattr(collect_refunding_data, "parse_recommended_pdf", recording_parse)
+    offline = HttpCache(str(tmp_path), offline=True)
+    assert collect_data(max_quarters=2, session=fake_treasury, cache=offline, parse_workers=1) == expected
+    assert len(received) == 2 and all(isinstance(document, StoredDocument) for document in received)
+
+
+def test_small_cache_keeps_documents_until_their_quarter_is_parsed(fake_treasury, tmp_path: Path) -> None:
+    expected = collect_data(max_quarters=2, session=fake_treasury, parse_workers=1)
+    cache = HttpCache(str(tmp_path), max_bytes=100 * 1024)
+    assert collect_data(max_quarters=2, session=fake_treasury, cache=cache, parse_workers=1) == expected
+    assert collect_data(max_quarters=2, session=fake_treasury, cache=cache, parse_workers=2) == expected
+    assert cache.total_bytes() <= 100 * 1024
+
+
+def test_collect_data_rejects_invalid_concurrency(fake_treasury) -> None:
+    with pytest.raises(ValueError):
+        collect_data(max_quarters=1, concurrency=0, session=fake_treasury)
+
+
+def test_collect_data_skips_quarters_already_collected(fake_treasury) -> None:
+    entries = collect_data(max_quarters=2, session=fake_treasury, skip_quarters={(2025, 2)})
+    assert {entry.Quarter_year for entry in entries} == {"Q3 2025"}
+    assert all("2025-q2" not in url for url in fake_treasury.requested)
+
+
+def test_resume_replays_checkpointed_quarters_without_fetching(
+    fake_treasury, fake_session_factory, tmp_path: Path
+) -> None:
+    expected = collect_data(max_quarters=2, session=fake_treasury, checkpoint=Checkpoint(str(tmp_path)))
+    manifest = json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8"))
+    assert {label: status["status"] for label, status in manifest["quarters"].items()} == {
+        "Q3 2025": "complete",
+        "Q2 2025": "complete",
+    }
+
+    offline_session = fake_session_factory({})
+    resumed = collect_data(max_quarters=2, session=offline_session, checkpoint=Checkpoint(str(tmp_path), resume=True))
+    assert resumed == expected
+    assert offline_session.requested == []
+
+
+def test_resume_retries_only_the_failed_quarter(fake_treasury, fake_session_factory, tmp_path: Path) -> None:
+    expected = collect_data(max_quarters=2, session=fake_treasury)
+    broken = fake_session_factory(
+        {url: body for url, body in fake_treasury.documents.items() if "recommended/2025-q2" not in url}
+    )
+    with pytest.raises(KeyError):
+        collect_data(max_quarters=2, session=broken, parse_workers=1, checkpoint=Checkpoint(str(tmp_path)))
+    manifest = json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["quarters"]["Q3 2025"]["status"] == "complete"
+    assert manifest["quarters"]["Q2 2025"]["status"] == "failed"
+
+    retry_session = fake_session_factory(fake_treasury.documents)
+    checkpoint = Checkpoint(str(tmp_path), resume=True)
+    assert collect_data(max_quarters=2, session=retry_session, checkpoint=checkpoint) == expected
+    assert all("2025-q2" in url for url in retry_session.requested)
+    assert checkpoint.completed() == {"Q3 2025", "Q2 2025"}
+
+
+def test_checkpoint_without_resume_starts_over(fake_treasury, tmp_path: Path) -> None:
+    collect_data(max_quarters=2, session=fake_treasury, checkpoint=Checkpoint(str(tmp_path)))
+    checkpoint = Checkpoint(str(tmp_path))
+    assert checkpoint.completed() == set()
+    assert not (tmp_path / "Q3_2025.csv").exists()
+
+
+def test_resume_ignores_checkpoints_from_another_parser_version(fake_treasury, tmp_path: Path) -> None:
+    collect_data(max_quarters=2, session=fake_treasury, checkpoint=Checkpoint(str(tmp_path), fingerprint="old"))
+    assert Checkpoint(str(tmp_path), resume=True, fingerprint="new").completed() == set()
+
+
+def test_archive_keeps_quarters_with_only_one_document(fake_treasury, monkeypatch: pytest.MonkeyPatch) -> None:
+    recommended_links = {(2025, 3): "https://example.test/recommended/2025-q3.pdf"}
+    monkeypatch.setattr(
+        collect_refunding_data,
+        "extract_recommended_links",
+        lambda session=None, cache=None, metrics=None: recommended_links,
+    )
+    assert {entry.Quarter_year for entry in collect_data(max_quarters=None, session=fake_treasury)} == {"Q3 2025"}
+
+    metrics = RunMetrics()
+    entries = collect_data(max_quarters=None, session=fake_treasury, metrics=metrics, archive=True)
+    older = [entry for entry in entries if entry.Quarter_year == "Q2 2025"]
+    assert older and all(entry.Data_type is not DataType.RECOMMENDATION_FOR_THIS_REFUNDING for entry in older)
+    quarters = metrics.report()["quarters"]
+    assert quarters["Q2 2025"]["documents_missing"] == 1
+    assert quarters["Q2 2025"]["quarters_none"] == 1
+    assert "quarters_none" not in quarters["Q3 2025"]
+
+
+def test_archive_records_failed_quarters_and_continues(fake_treasury, fake_session_factory) -> None:
+    expected = [entry for entry in collect_data(session=fake_treasury) if entry.Quarter_year == "Q3 2025"]
+    broken = fake_session_factory(
+        {url: body for url, body in fake_treasury.documents.items() if "recommended/2025-q2" not in url}
+    )
+    metrics = RunMetrics()
+    assert collect_data(max_quarters=None, session=broken, parse_workers=1, metrics=metrics, archive=True) == expected
+    assert list(metrics.report()["failures"]) == ["Q2 2025"]
+    assert metrics.report()["failures"]["Q2 2025"].startswith("KeyError")
+
+
+def test_year_range_limits_the_collected_quarters(fake_treasury) -> None:
+    assert collect_data(max_quarters=None, session=fake_treasury, first_year=2026) == []
+    entries = collect_data(max_quarters=None, session=fake_treasury, first_year=2025, last_year=2025)
+    assert {entry.Quarter_year for entry in entries} == {"Q3 2025", "Q2 2025"}
+    with pytest.raises(ValueError):
+        collect_data(session=fake_treasury, first_year=2025, last_year=2024)
+
+
+def test_merge_csv_adds_new_quarters_in_order(fake_treasury, tmp_path: Path) -> None:
+    output = tmp_path / "refunding_data.csv"
+    write_csv(collect_data(max_quarters=2, session=fake_treasury, skip_quarters={(2025, 3)}), str(output))
+    assert existing_quarters(str(output)) == {(2025, 2)}
+
+    new_entries = collect_data(max_quarters=2, session=fake_treasury, skip_quarters=existing_quarters(str(output)))
+    added = merge_csv(new_entries, str(output))
+
+    merged = read_csv(str(output))
+    assert added == len(new_entries)
+    assert [row.Quarter_year for row in merged][0] == "Q3 2025"
+    full = tmp_path / "full.csv"
+    write_csv(collect_data(max_quarters=2, session=fake_treasury), str(full))
+    assert output.read_text(encoding="utf-8") == full.read_text(encoding="utf-8")
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["full.csv", "refunding_data.csv"]
+
+
+def test_iter_collected_entries_streams_the_same_rows(fake_treasury) -> None:
+    stream = iter_collected_entries(max_quarters=2, session=fake_treasury, parse_workers=1)
+    first = next(stream)
+    assert first.Quarter_year == "Q3 2025"
+    assert [first, *stream] == collect_data(max_quarters=2, session=fake_treasury, parse_workers=1)
+
+
+def _interrupted_rows():
+    yield RefundingRow(
+        "Q3 2025",
+        "2025-07-30",
+        SecurityType.NOTE,
+        2.0,
+        Units.YEARS,
+        "2025-08",
+        "",
+        69.0,
+        DataType.RECOMMENDATION_FOR_THIS_REFUNDING,
+        NOTE_MATRIX_TABLE,
+    )
+    raise KeyboardInterrupt
+
+
+def test_write_csv_leaves_existing_output_untouched_on_interrupt(tmp_path: Path) -> None:
+    output = tmp_path / "refunding_data.csv"
+    output.write_text("previous run\n", encoding="utf-8")
+    with pytest.raises(KeyboardInterrupt):
+        write_csv(_interrupted_rows(), str(output))
+    assert output.read_text(encoding="utf-8") == "previous run\n"
+    assert [path.name for path in tmp_path.iterdir()] == ["refunding_data.csv"]
+
+
+def test_write_csv_can_keep_partial_rows_on_interrupt(tmp_path: Path) -> None:
+    output = tmp_path / "refunding_data.csv"
+    with pytest.raises(KeyboardInterrupt):
+        write_csv(_interrupted_rows(), str(output), keep_partial=True)
+    assert not output.exists()
+    partial = read_csv(str(tmp_path / "refunding_data.csv.partial"))
+    assert [row.Quarter_year for row in partial] == ["Q3 2025"]
+
+
+def test_merge_csv_can_keep_partial_rows_on_interrupt(tmp_path: Path) -> None:
+    output = tmp_path / "refunding_data.csv"
+    output.write_text(
+        "Quarter_year,Date,Security_type,Maturity,Units,Auction_month,Auction_date,Offered_amount,Data_type,Notes\n"
+        "Q2 2025,2025-04-30,NOTE,2.0,YEARS,2025-05,,69.0,HISTORICAL_REFERENCE,\n",
+        encoding="utf-8",
+    )
+    before = output.read_text(encoding="utf-8")
+    with pytest.raises(KeyboardInterrupt):
+        merge_csv(_interrupted_rows(), str(output), keep_partial=True)
+    assert output.read_text(encoding="utf-8") == before
+    partial = read_csv(str(tmp_path / "refunding_data.csv.partial"))
+    assert [row.Quarter_year for row in partial] == ["Q3 2025", "Q2 2025"]
+
+
+def test_main_checkpoints_only_when_asked(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    checkpoints: List[object] = []
+
+    def collect(**kwargs: object) -> Iterator[RefundingRow]:
+        checkpoints.append(kwargs["checkpoint"])
+        return iter([])
+
+    monkeypatch.setattr(collect_refunding_data, "iter_collected_entries", collect)
+    cache_dir = tmp_path / "cache"
+    args = ["--no-cache", "--no-parse-cache", "--cache-dir", str(cache_dir), "--output", str(tmp_path / "out.csv")]
+    main(args)
+    assert checkpoints == [None]
+    assert not cache_dir.exists()
+
+    main(args + ["--resume"])
+    main(args + ["--checkpoint-dir", str(tmp_path / "checkpoints")])
+    assert [checkpoint.directory for checkpoint in checkpoints[1:]] == [
+        str(cache_dir / "checkpoints"),
+        str(tmp_path / "checkpoints"),
+    ]
+
+
+def _snapshot_row(quarter: str, date: str, month: str, amount: float, data_type: DataType) -> RefundingRow:
+    return RefundingRow(quarter, date, SecurityType.NOTE, 2.0, Units.YEARS, month, "", amount, data_type, "")
+
+
+def test_consolidate_entries_keeps_latest_known_value_per_month_and_security() -> None:
+    metrics = RunMetrics()
+    rows = [
+        _snapshot_row("Q3 2025", "2025-07-30", "2025-08", 69.0, DataType.RECOMMENDATION_FOR_THIS_REFUNDING),
+        _snapshot_row("Q3 2025", "2025-07-30", "2025-06", 69.0, DataType.HISTORICAL_REFERENCE),
+        _snapshot_row("Q2 2025", "2025-04-30", "2025-06", 68.0, DataType.RECOMMENDATION_FOR_THIS_REFUNDING),
+        _snapshot_row("Q2 2025", "2025-04-30", "2025-08", 67.0, DataType.INDICATIONS_FOR_NEXT_REFUNDING),
+        _snapshot_row("Q2 2025", "2025-04-30", "2025-03", 66.0, DataType.HISTORICAL_REFERENCE),
+        _snapshot_row("Q1 2025", "2025-02-05", "2025-03", 65.0, DataType.HISTORICAL_REFERENCE),
+        _snapshot_row("Q1 2025", "2025-02-05", "", 12.0, DataType.RECOMMENDATION_FOR_THIS_REFUNDING),
+        _snapshot_row("Q4 2024", "2024-10-30", "", 11.0, DataType.RECOMMENDATION_FOR_THIS_REFUNDING),
+    ]
+    consolidated = consolidate_entries(rows, metrics)
+    assert [(row.Auction_month, row.Offered_amount) for row in consolidated] == [
+        ("2025-08", 69.0),
+        ("2025-06", 69.0),
+        ("2025-03", 66.0),
+        ("", 12.0),
+        ("", 11.0),
+    ]
+    assert metrics.counters["consolidation_superseded"] == 3
+    assert "consolidation_conflicts" not in metrics.counters
+
+    consolidate_entries(rows + [rows[1]._replace(Offered_amount=70.0)], metrics)
+    assert metrics.counters["consolidation_conflicts"] == 1
+
+
+def test_consolidate_entries_keeps_same_month_auctions_apart() -> None:
+    metrics = RunMetrics()
+    first = _snapshot_row("Q3 2025", "2025-07-30", "2025-08", 30.0, DataType.RECOMMENDATION_FOR_THIS_REFUNDING)
+    rows = [
+        first._replace(Auction_date="2025-08-05"),
+        first._replace(Auction_date="2025-08-19", Offered_amount=25.0),
+        first._replace(Quarter_year="Q2 2025", Date="2025-04-30", Auction_date="2025-08-19", Offered_amount=24.0),
+    ]
+    consolidated = consolidate_entries(rows, metrics)
+    assert sorted((row.Auction_date, row.Offered_amount) for row in consolidated) == [
+        ("2025-08-05", 30.0),
+        ("2025-08-19", 25.0),
+    ]
+    assert metrics.counters["consolidation_superseded"] == 1
+    assert "consolidation_conflicts" not in metrics.counters
+
+
+def test_consolidate_entries_lets_an_undated_actual_replace_dated_recommendations() -> None:
+    recommended = _snapshot_row("Q2 2025", "2025-04-30", "2025-06", 68.0, DataType.RECOMMENDATION_FOR_THIS_REFUNDING)
+    actual = _snapshot_row("Q3 2025", "2025-07-30", "2025-06", 69.0, DataType.HISTORICAL_REFERENCE)
+    rows = [
+        recommended._replace(Auction_date="2025-06-03"),
+        recommended._replace(Auction_date="2025-06-17", Offered_amount=22.0),
+        actual,
+    ]
+    for ordered in (rows, rows[::-1]):
+        metrics = RunMetrics()
+        assert consolidate_entries(ordered, metrics) == [actual]
+        assert metrics.counters["consolidation_superseded"] == 2
+
+    indication = _snapshot_row("Q1 2025", "2025-02-05", "2025-06", 60.0, DataType.INDICATIONS_FOR_NEXT_REFUNDING)
+    assert consolidate_entries([indication, rows[0]]) == [rows[0]]
+    assert consolidate_entries([rows[0], indication]) == [rows[0]]
+
+
+def test_consolidated_table_covers_every_snapshot_key_once(fake_treasury) -> None:
+    raw = collect_data(max_quarters=2, session=fake_treasury, parse_workers=1)
+    consolidated = consolidate_entries(raw)
+    keys = [(row.Auction_month, row.Auction_date, row.Security_type, row.Maturity, row.Units) for row in consolidated]
+    assert len(keys) == len(set(keys))
+    months = defaultdict(set)
+    for month, auction_date, *security in keys:
+        months[(month, *security)].add(auction_date)
+    assert set(months) == {(row.Auction_month, row.Security_type, row.Maturity, row.Units) for row in raw}
+    assert all("" not in dates or len(dates) == 1 for dates in months.values())
+    assert len(consolidated) < len(raw)
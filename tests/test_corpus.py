@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+import pytest
+
+from collect_refunding_data import parse_recommended_pdf, recommended_parser_path
+from refunding_corpus import (
+    PARSER_LABELS,
+    generate_corpus,
+    load_corpus,
+    main,
+    matrix_pdf,
+    measure_throughput,
+    parse_corpus_document,
+    regex_pdf,
+)
+
+
+def test_generated_documents_parse_to_the_expected_rows(tmp_path: Path) -> None:
+    documents = generate_corpus(str(tmp_path), documents_per_size=1, sizes=(1, 2))
+    assert load_corpus(str(tmp_path)) == documents
+    assert {(document.kind, document.size) for document in documents} == {
+        (kind, size) for kind in PARSER_LABELS for size in (1, 2)
+    }
+    for document in documents:
+        assert parse_corpus_document(document) == document.expected_rows > 0
+
+
+@pytest.mark.parametrize("generator,parser_path", [(matrix_pdf, "matrix"), (regex_pdf, "regex_fallback")])
+def test_synthetic_pdfs_exercise_each_recommended_parser_path(generator, parser_path: str) -> None:
+    body, expected = generator(random.Random(7), 2024, 3, 2)
+    entries = parse_recommended_pdf(body, 3, 2024, "2024-08-01")
+    assert len(entries) == expected
+    assert recommended_parser_path(entries) == parser_path
+    assert all(entry.Quarter_year == "Q3 2024" for entry in entries)
+
+
+def test_generation_is_deterministic_per_seed(tmp_path: Path) -> None:
+    first = generate_corpus(str(tmp_path / "a"), documents_per_size=2, sizes=(1,), kinds=("official",))
+    second = generate_corpus(str(tmp_path / "b"), documents_per_size=2, sizes=(1,), kinds=("official",))
+    assert [document.sha256 for document in first] == [document.sha256 for document in second]
+    with pytest.raises(ValueError):
+        generate_corpus(str(tmp_path / "c"), kinds=("spreadsheet",))
+
+
+def test_throughput_reports_rates_per_parser_and_size(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    documents = generate_corpus(str(tmp_path), documents_per_size=1, sizes=(1,), kinds=("official", "regex"))
+    results = measure_throughput(documents, isolated=False)
+    assert [result.parser for result in results] == [PARSER_LABELS["official"], PARSER_LABELS["regex"]]
+    assert all(result.mismatches == 0 and result.rows_per_second > 0 for result in results)
+
+    report = tmp_path / "throughput.json"
+    main(["--corpus", str(tmp_path), "throughput", "--json", str(report)])
+    assert "parse_official_article" in capsys.readouterr().out
+    assert [entry["rows"] for entry in json.loads(report.read_text(encoding="utf-8"))] == [
+        result.rows for result in results
+    ]
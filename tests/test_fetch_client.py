@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import List
+
+import pytest
+import requests
+
+from collect_refunding_data import HttpCache, RateLimiter, RunMetrics, create_session, fetch_document
+
+
+def test_fetch_document_retries_transient_server_errors(stand_in_server, stand_in_response) -> None:
+    url = stand_in_server.route(
+        "/remarks",
+        stand_in_response(503, b"busy"),
+        stand_in_response(502, b"bad gateway"),
+        stand_in_response(200, b"<html>remarks</html>"),
+    )
+    metrics = RunMetrics()
+    session = create_session(retries=3, backoff_factor=0, rate_limit=None)
+    assert fetch_document(session, url, metrics=metrics) == b"<html>remarks</html>"
+    assert stand_in_server.hits("/remarks") == 3
+    assert metrics.counters["http_requests"] == 1
+    assert metrics.counters["http_retries"] == 2
+
+
+def test_fetch_document_honours_retry_after_on_throttling(stand_in_server, stand_in_response) -> None:
+    url = stand_in_server.route(
+        "/remarks",
+        stand_in_response(429, b"slow down", {"Retry-After": "0"}),
+        stand_in_response(200, b"ok"),
+    )
+    session = create_session(retries=2, backoff_factor=0, rate_limit=None)
+    assert fetch_document(session, url) == b"ok"
+    assert stand_in_server.hits("/remarks") == 2
+
+
+def test_fetch_document_raises_once_retries_are_exhausted(stand_in_server, stand_in_response) -> None:
+    url = stand_in_server.route("/remarks", stand_in_response(500, b"error"))
+    session = create_session(retries=2, backoff_factor=0, rate_limit=None)
+    with pytest.raises(requests.HTTPError):
+        fetch_document(session, url)
+    assert stand_in_server.hits("/remarks") == 3
+
+
+def test_fetch_document_does_not_retry_client_errors(stand_in_server) -> None:
+    session = create_session(retries=3, backoff_factor=0, rate_limit=None)
+    with pytest.raises(requests.HTTPError):
+        fetch_document(session, stand_in_server.url("/missing"))
+    assert stand_in_server.hits("/missing") == 1
+
+
+def test_session_keeps_connections_alive_across_documents(stand_in_server, stand_in_response) -> None:
+    urls = [stand_in_server.route(f"/doc{index}", stand_in_response(200, b"x" * index)) for index in range(5)]
+    session = create_session(connections_per_host=1, rate_limit=None)
+    for url in urls:
+        fetch_document(session, url)
+    assert len({client_port for _, client_port, _ in stand_in_server.requests}) == 1
+
+
+def test_fetch_document_revalidates_cached_documents_over_http(
+    tmp_path: Path, stand_in_server, stand_in_response
+) -> None:
+    url = stand_in_server.route(
+        "/index",
+        stand_in_response(200, b"<html>index</html>", {"ETag": '"v1"'}),
+        stand_in_response(304, b"", {"ETag": '"v1"'}),
+    )
+    cache = HttpCache(str(tmp_path))
+    session = create_session(rate_limit=None)
+    assert fetch_document(session, url, cache) == b"<html>index</html>"
+    assert fetch_document(session, url, cache) == b"<html>index</html>"
+    assert stand_in_server.requests[-1][2].get("If-None-Match") == '"v1"'
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_rate_limiter_allows_a_burst_then_spaces_requests() -> None:
+    clock = _FakeClock()
+    limiter = RateLimiter(rate=2.0, burst=3, clock=clock, sleep=clock.sleep)
+    delays = [limiter.acquire() for _ in range(5)]
+    assert delays[:3] == [0.0, 0.0, 0.0]
+    assert delays[3:] == [pytest.approx(0.5), pytest.approx(0.5)]
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_rate_limiter_refills_while_idle() -> None:
+    clock = _FakeClock()
+    limiter = RateLimiter(rate=1.0, burst=2, clock=clock, sleep=clock.sleep)
+    limiter.acquire()
+    limiter.acquire()
+    clock.now += 10.0
+    assert [limiter.acquire(), limiter.acquire()] == [0.0, 0.0]
+    assert limiter.acquire() == pytest.approx(1.0)
+
+
+def test_rate_limiter_rejects_invalid_settings() -> None:
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0)
+    with pytest.raises(ValueError):
+        RateLimiter(rate=1.0, burst=0)
+
+
+def test_rate_limited_session_paces_requests(stand_in_server, stand_in_response) -> None:
+    url = stand_in_server.route("/doc", stand_in_response(200, b"x"))
+    session = create_session(rate_limit=20.0)
+    adapter = session.get_adapter(url)
+    clock = _FakeClock()
+    adapter.rate_limiter = RateLimiter(rate=20.0, burst=1, clock=clock, sleep=clock.sleep)
+    for _ in range(4):
+        fetch_document(session, url)
+    assert clock.sleeps == [pytest.approx(0.05)] * 3
+
+
+class _CountingRateLimiter(RateLimiter):
+    acquisitions = 0
+
+    def acquire(self) -> float:
+        self.acquisitions += 1
+        return super().acquire()
+
+
+def test_rate_limiter_paces_every_retried_attempt(stand_in_server, stand_in_response) -> None:
+    url = stand_in_server.route(
+        "/remarks",
+        stand_in_response(503, b"busy"),
+        stand_in_response(429, b"slow down", {"Retry-After": "0"}),
+        stand_in_response(200, b"<html>remarks</html>"),
+    )
+    session = create_session(retries=3, backoff_factor=0, rate_limit=20.0)
+    clock = _FakeClock()
+    limiter = _CountingRateLimiter(rate=20.0, burst=1, clock=clock, sleep=clock.sleep)
+    session.get_adapter(url).rate_limiter = limiter
+    assert fetch_document(session, url) == b"<html>remarks</html>"
+    assert stand_in_server.hits("/remarks") == limiter.acquisitions == 3
+    assert clock.sleeps == [pytest.approx(0.05)] * 2
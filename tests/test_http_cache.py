@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+
+from collect_refunding_data import HttpCache, StoredDocument, fetch_document, fetch_stored_document
+
+
+class ConditionalResponse:
+    def __init__(self, status_code: int, body: bytes, headers: Dict[str, str]) -> None:
+        self.status_code = status_code
+        self.content = body
+        self.headers = headers
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class ConditionalSession:
+    def __init__(self, body: bytes, etag: str = '"v1"') -> None:
+        self.body = body
+        self.etag = etag
+        self.statuses: List[int] = []
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: float = 0) -> ConditionalResponse:
+        if (headers or {}).get("If-None-Match") == self.etag:
+            self.statuses.append(304)
+            return ConditionalResponse(304, b"", {"ETag": self.etag})
+        self.statuses.append(200)
+        return ConditionalResponse(200, self.body, {"ETag": self.etag})
+
+
+def test_fetch_document_revalidates_with_etag(tmp_path: Path) -> None:
+    cache = HttpCache(str(tmp_path))
+    session = ConditionalSession(b"<html>remarks</html>")
+    assert fetch_document(session, "https://example.test/a", cache) == b"<html>remarks</html>"
+    assert fetch_document(session, "https://example.test/a", cache) == b"<html>remarks</html>"
+    assert session.statuses == [200, 304]
+
+
+def test_cache_persists_and_serves_offline(tmp_path: Path) -> None:
+    fetch_document(ConditionalSession(b"%PDF-1.4"), "https://example.test/b.pdf", HttpCache(str(tmp_path)))
+    offline = HttpCache(str(tmp_path), offline=True)
+    assert fetch_document(None, "https://example.test/b.pdf", offline) == b"%PDF-1.4"
+    with pytest.raises(RuntimeError):
+        fetch_document(None, "https://example.test/missing.pdf", offline)
+
+
+def test_cache_evicts_least_recently_used_documents(tmp_path: Path) -> None:
+    cache = HttpCache(str(tmp_path), max_bytes=10)
+    cache.put("https://example.test/1", b"aaaa")
+    cache.put("https://example.test/2", b"bbbb")
+    assert cache.get("https://example.test/1") == b"aaaa"
+    cache.put("https://example.test/3", b"cccc")
+    assert cache.get("https://example.test/2") is None
+    assert cache.get("https://example.test/1") == b"aaaa"
+    assert cache.total_bytes() <= 10
+
+
+def test_cache_hits_only_reach_the_index_on_flush(tmp_path: Path) -> None:
+    cache = HttpCache(str(tmp_path), max_bytes=10)
+    cache.put("https://example.test/1", b"aaaa")
+    cache.put("https://example.test/2", b"bbbb")
+    index = tmp_path / "index.json"
+    written = index.read_text(encoding="utf-8")
+    assert cache.get("https://example.test/1") == b"aaaa"
+    assert index.read_text(encoding="utf-8") == written
+    cache.flush()
+    assert index.read_text(encoding="utf-8") != written
+
+    reopened = HttpCache(str(tmp_path), max_bytes=10)
+    reopened.put("https://example.test/3", b"cccc")
+    assert reopened.get("https://example.test/2") is None
+    assert reopened.get("https://example.test/1") == b"aaaa"
+
+
+def test_cache_shares_identical_bodies(tmp_path: Path) -> None:
+    cache = HttpCache(str(tmp_path))
+    cache.put("https://example.test/x", b"same")
+    cache.put("https://example.test/y", b"same")
+    assert cache.total_bytes() == 4
+    assert len(list((tmp_path / "objects").rglob("*"))) == 2
+
+
+def test_stored_documents_point_at_cache_objects(tmp_path: Path) -> None:
+    session = ConditionalSession(b"%PDF-1.4")
+    stored = fetch_stored_document(session, "https://example.test/c.pdf", HttpCache(str(tmp_path)))
+    assert isinstance(stored, StoredDocument)
+    assert stored.size == 8 and Path(stored.path).parent.parent == tmp_path / "objects"
+    offline = fetch_stored_document(None, "https://example.test/c.pdf", HttpCache(str(tmp_path), offline=True))
+    assert offline == stored
+    with offline.mapped() as view:
+        assert view[:] == b"%PDF-1.4"
+    assert fetch_stored_document(ConditionalSession(b"<html></html>"), "https://example.test/d") == b"<html></html>"
+
+
+def test_pinned_documents_survive_eviction_until_released(tmp_path: Path) -> None:
+    cache = HttpCache(str(tmp_path), max_bytes=6)
+    pinned = cache.put("https://example.test/1", b"aaaa", pin=True)
+    cache.put("https://example.test/2", b"bbbb")
+    assert Path(pinned.path).exists()
+    cache.release(pinned)
+    assert not Path(pinned.path).exists()
+    assert cache.get("https://example.test/2") == b"bbbb"
+    assert cache.total_bytes() <= 6
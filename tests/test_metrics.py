@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from collect_refunding_data import RunMetrics, collect_data, extract_quarter_links
+
+
+def test_collect_data_records_stage_timings_and_counters(fake_treasury) -> None:
+    metrics = RunMetrics()
+    entries = collect_data(max_quarters=2, session=fake_treasury, parse_workers=1, metrics=metrics)
+    report = metrics.report()
+
+    for stage in ("official_download", "recommended_download", "recommended_parse"):
+        assert report["stages"][stage]["calls"] >= 2
+    # Inline parses are recorded under a single stage, once per quarter.
+    assert report["stages"]["recommended_parse"]["calls"] == 2
+    assert not any(stage.startswith("recommended_parse_") for stage in report["stages"])
+    quarter_seconds = sum(quarter["recommended_parse_seconds"] for quarter in report["quarters"].values())
+    assert quarter_seconds == pytest.approx(report["stages"]["recommended_parse"]["seconds"])
+    counters = report["counters"]
+    assert counters["http_requests"] == 4
+    assert counters["http_bytes_downloaded"] == sum(len(body) for body in fake_treasury.documents.values())
+    assert counters["rows_official"] + counters.get("rows_matrix", 0) == len(entries)
+    assert set(report["quarters"]) == {"Q3 2025", "Q2 2025"}
+    assert report["quarters"]["Q3 2025"]["rows_matrix"] > 0
+
+
+def test_run_metrics_exports_json_and_prometheus(tmp_path: Path) -> None:
+    metrics = RunMetrics()
+    with metrics.stage("official_parse", "Q3 2025"):
+        pass
+    metrics.increment("http_cache_hits", 3)
+    metrics.write_json(str(tmp_path / "report.json"))
+    metrics.write_prometheus(str(tmp_path / "metrics.prom"))
+
+    report = json.loads((tmp_path / "report.json").read_text(encoding="utf-8"))
+    assert report["stages"]["official_parse"]["calls"] == 1
+    text = (tmp_path / "metrics.prom").read_text(encoding="utf-8")
+    assert 'refunding_stage_calls_total{stage="official_parse"} 1' in text
+    assert "refunding_http_cache_hits_total 3" in text
+
+
+def test_timed_iter_measures_producer_time_only() -> None:
+    metrics = RunMetrics()
+    assert list(metrics.timed_iter(iter([1, 2, 3]), "collect")) == [1, 2, 3]
+    assert metrics.report()["stages"]["collect"]["calls"] == 1
+
+
+def test_extract_quarter_links_times_index_page_stages(index_html_loader, fake_session_factory) -> None:
+    session = fake_session_factory({"https://example.test/index": index_html_loader("official").encode("utf-8")})
+    metrics = RunMetrics()
+    links = extract_quarter_links("https://example.test/index", session, metrics=metrics)
+    stages = metrics.report()["stages"]
+    assert (2025, 3) in links
+    assert stages["index_page_download"]["calls"] == 1
+    assert stages["index_page_parse"]["calls"] == 1
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+import collect_refunding_data
+from collect_refunding_data import ParseCache, collect_data
+
+
+def test_parse_cache_round_trips_entries(tmp_path: Path) -> None:
+    cache = ParseCache(str(tmp_path / "parsed.sqlite3"), fingerprint="v1")
+    key = cache.key("recommended", b"%PDF", 2025, 3, "2025-07-30")
+    assert cache.get(key) is None
+    cache.put(key, [{"Quarter_year": "Q3 2025", "Maturity": 2.0}])
+    assert cache.get(key) == [{"Quarter_year": "Q3 2025", "Maturity": 2.0}]
+    assert key != cache.key("recommended", b"%PDF", 2025, 3, "2025-07-31")
+    assert key != cache.key("recommended", b"%PDF-1.7", 2025, 3, "2025-07-30")
+
+
+def test_parse_cache_drops_results_from_other_parser_versions(tmp_path: Path) -> None:
+    path = str(tmp_path / "parsed.sqlite3")
+    old = ParseCache(path, fingerprint="v1")
+    old.put(old.key("official", b"<html>", 2025, 3), {"date": "2025-07-30", "entries": []})
+    old.close()
+    new = ParseCache(path, fingerprint="v2")
+    assert new.get(new.key("official", b"<html>", 2025, 3)) is None
+    assert new.get(old.key("official", b"<html>", 2025, 3)) is None
+
+
+def test_collect_data_reuses_cached_parses(
+    fake_treasury, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = ParseCache(str(tmp_path / "parsed.sqlite3"))
+    first = collect_data(max_quarters=2, session=fake_treasury, parse_workers=1, parse_cache=cache)
+
+    def fail(*args: object, **kwargs: object) -> None:
+        raise AssertionError("parser should not run on a cache hit")
+
+    monkeypatch.setattr(collect_refunding_data, "parse_official_article", fail)
+    monkeypatch.setattr(collect_refunding_data, "parse_recommended_pdf", fail)
+    assert collect_data(max_quarters=2, session=fake_treasury, parse_workers=1, parse_cache=cache) == first
+
+
+def _fingerprint_of_variant(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, name: str, old: str, new: str
+) -> str:
+    source = Path(collect_refunding_data.__file__).read_text(encoding="utf-8")
+    assert source.count(old) == 1
+    path = tmp_path / f"{name}.py"
+    path.write_text(source.replace(old, new), encoding="utf-8")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    monkeypatch.setitem(sys.modules, name, module)
+    spec.loader.exec_module(module)
+    return module.parser_fingerprint()
+
+
+def test_parser_fingerprint_only_follows_parser_code(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = str(tmp_path / "parsed.sqlite3")
+    cache = ParseCache(path)
+    key = cache.key("official", b"<html>", 2025, 3)
+    cache.put(key, {"date": "2025-07-30", "entries": []})
+    cache.close()
+
+    unrelated = _fingerprint_of_variant(
+        tmp_path,
+        monkeypatch,
+        "unrelated_edit",
+        "DEFAULT_WATCH_INTERVAL = 300.0\n",
+        "# Polling a little less often.\nDEFAULT_WATCH_INTERVAL = 600.0\n",
+    )
+    assert unrelated == collect_refunding_data.parser_fingerprint()
+    assert ParseCache(path, fingerprint=unrelated).get(key) == {"date": "2025-07-30", "entries": []}
+
+    parser_edit = _fingerprint_of_variant(
+        tmp_path,
+        monkeypatch,
+        "parser_edit",
+        'NOTE_ACTUAL = "Actual auction size from prior quarter"',
+        'NOTE_ACTUAL = "Actual auction size"',
+    )
+    assert parser_edit != collect_refunding_data.parser_fingerprint()
+    assert ParseCache(path, fingerprint=parser_edit).get(key) is None
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
 import io
+from pathlib import Path
 
 import pdfplumber
 import pytest
+from bs4 import BeautifulSoup
 
 from collect_refunding_data import (
+    HttpCache,
     _parse_matrix_recommended_pages,
+    _parse_official_soup,
+    _parse_quarter_links,
+    _quarter_table_strainer,
+    _recommendation_pages,
     categorize_security,
     parse_maturity,
+    parse_official_article,
     parse_recommended_pdf,
 )
 
@@ -57,8 +65,8 @@ def test_parse_recommended_pdf_extracts_matrix_data(
     pdf_bytes = recommended_pdf_loader(label)
     entries = parse_recommended_pdf(pdf_bytes, int(label.split()[0][1:]), int(label.split()[1]), "2025-01-01")
     assert entries, "Expected entries to be parsed from matrix style PDF"
-    assert all(entry["Data_type"] == "RECOMMENDATION_FOR_THIS_REFUNDING" for entry in entries)
-    assert {entry["Security_type"] for entry in entries} >= {"NOTE", "BOND", "FRN", "TIPS"}
+    assert all(entry.Data_type == "RECOMMENDATION_FOR_THIS_REFUNDING" for entry in entries)
+    assert {entry.Security_type for entry in entries} >= {"NOTE", "BOND", "FRN", "TIPS"}
 
 
 @pytest.mark.parametrize(
@@ -77,6 +85,75 @@ def test_parse_matrix_recommended_pages_matches_pdf_tables(
             announcement_date="2025-01-01",
         )
     assert entries, "Matrix parser should extract entries from provided fixture"
-    assert all(entry["Quarter_year"] == label for entry in entries)
-    assert all(entry["Units"] == "YEARS" for entry in entries)
+    assert all(entry.Quarter_year == label for entry in entries)
+    assert all(entry.Units == "YEARS" for entry in entries)
 
+
+@pytest.mark.parametrize("label", ["Q3 2025", "Q2 2025"])
+def test_parse_recommended_pdf_matches_full_page_scan(label: str, recommended_pdf_loader) -> None:
+    pdf_bytes = recommended_pdf_loader(label)
+    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+        full_scan = _parse_matrix_recommended_pages(pdf.pages, label, "2025-01-01")
+    quarter, year = int(label.split()[0][1:]), int(label.split()[1])
+    assert parse_recommended_pdf(pdf_bytes, quarter, year, "2025-01-01") == full_scan
+
+
+@pytest.mark.parametrize("label", ["Q3 2025", "Q2 2025"])
+def test_parse_official_article_matches_full_document_parse(label: str, official_html_loader) -> None:
+    html = official_html_loader(label)
+    quarter, year = int(label.split()[0][1:]), int(label.split()[1])
+    full_parse = _parse_official_soup(BeautifulSoup(html, "lxml"), year, quarter)
+    assert full_parse[1]
+    assert parse_official_article(html, year, quarter) == full_parse
+
+
+@pytest.mark.parametrize("label", ["Q3 2025", "Q2 2025"])
+def test_parsers_read_stored_documents_like_in_memory_ones(
+    label: str, official_html_loader, recommended_pdf_loader, tmp_path: Path
+) -> None:
+    cache = HttpCache(str(tmp_path))
+    html = official_html_loader(label).encode("utf-8")
+    pdf_bytes = recommended_pdf_loader(label)
+    quarter, year = int(label.split()[0][1:]), int(label.split()[1])
+    stored_html = cache.put("https://example.test/official", html)
+    stored_pdf = cache.put("https://example.test/recommended.pdf", pdf_bytes)
+    assert parse_official_article(stored_html, year, quarter) == parse_official_article(html, year, quarter)
+    assert parse_recommended_pdf(stored_pdf, quarter, year, "2025-01-01") == parse_recommended_pdf(
+        pdf_bytes, quarter, year, "2025-01-01"
+    )
+
+
+@pytest.mark.parametrize("name", ["official", "recommended"])
+def test_parse_quarter_links_strained_matches_full_document_parse(name: str, index_html_loader) -> None:
+    document = index_html_loader(name)
+    full_parse = _parse_quarter_links(BeautifulSoup(document, "lxml"))
+    assert (2025, 3) in full_parse
+    assert _parse_quarter_links(BeautifulSoup(document, "lxml", parse_only=_quarter_table_strainer())) == full_parse
+
+
+class _TextPage:
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.closed = False
+
+    def extract_text(self, layout: bool = False) -> str:
+        assert not layout, "the pre-scan must not render layout text"
+        return self.text
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_recommendation_pages_skips_pages_outside_the_section() -> None:
+    pages = [
+        _TextPage("Cover page"),
+        _TextPage("Recommendations for this Refunding"),
+        _TextPage("Feb-26 69 58 70"),
+        _TextPage("Provisional Next Refunding"),
+        _TextPage("Appendix"),
+    ]
+    page_texts: list[str] = []
+    selected = [page.text for page in _recommendation_pages(pages, page_texts)]
+    assert selected == ["Recommendations for this Refunding", "Feb-26 69 58 70"]
+    assert page_texts == [page.text for page in pages]
+    assert all(page.closed for page in pages)
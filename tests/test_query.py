@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from collect_refunding_data import DataType, SecurityType, collect_data, write_csv, write_sqlite
+from refunding_query import RefundingIndex, detect_format, main, make_server
+
+
+@pytest.fixture
+def sample_entries(fake_treasury):
+    return collect_data(max_quarters=2, session=fake_treasury, parse_workers=1)
+
+
+@pytest.fixture
+def csv_path(sample_entries, tmp_path: Path) -> Path:
+    path = tmp_path / "refunding_data.csv"
+    write_csv(sample_entries, str(path))
+    return path
+
+
+def _touch_later(path: Path) -> None:
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_rows_matches_a_full_scan(sample_entries, csv_path: Path) -> None:
+    index = RefundingIndex(str(csv_path))
+    expected = [
+        row
+        for row in sample_entries
+        if row.Security_type is SecurityType.NOTE
+        and row.Maturity == 2.0
+        and row.Data_type is DataType.HISTORICAL_REFERENCE
+    ]
+    assert expected
+    assert index.rows("NOTE", 2, data_type="HISTORICAL_REFERENCE") == expected
+    assert index.rows(quarter="Q2 2025") == [row for row in sample_entries if row.Quarter_year == "Q2 2025"]
+    month = expected[0].Auction_month
+    assert index.rows(auction_month=month) == [row for row in sample_entries if row.Auction_month == month]
+    assert index.rows("BILL", quarter="Q1 1999") == []
+
+
+def test_series_and_pivot_order_by_auction_month(sample_entries, csv_path: Path) -> None:
+    index = RefundingIndex(str(csv_path))
+    series = index.series("NOTE", 10)
+    assert [row.Auction_month for row in series] == sorted(row.Auction_month for row in series)
+    pivot = index.pivot("NOTE", 10)
+    assert list(pivot) == sorted(pivot)
+    latest = max(
+        (row for row in sample_entries if row.Security_type is SecurityType.NOTE and row.Maturity == 10.0),
+        key=lambda row: (row.Date, row.Auction_month),
+    )
+    assert pivot[latest.Auction_month][latest.Data_type.value] == latest.Offered_amount
+    assert set(index.pivot("NOTE", 10, columns="Quarter_year")["2025-06"]) <= {"Q3 2025", "Q2 2025"}
+
+
+def test_index_reloads_only_changed_quarters(sample_entries, tmp_path: Path) -> None:
+    path = tmp_path / "refunding_data.csv"
+    write_csv([row for row in sample_entries if row.Quarter_year == "Q3 2025"], str(path))
+    index = RefundingIndex(str(path), check_interval=0)
+    assert index.quarters() == ["Q3 2025"]
+
+    write_csv(sample_entries, str(path))
+    _touch_later(path)
+    assert index.quarters() == ["Q3 2025", "Q2 2025"]
+    assert index.last_reload == {"reused": 1, "rebuilt": 1, "dropped": 0}
+    assert index.rows(quarter="Q2 2025")
+
+    assert index.refresh() is False
+    assert index.reloads == 2
+
+
+def test_index_reads_sqlite_output(sample_entries, tmp_path: Path) -> None:
+    path = tmp_path / "refunding_data.sqlite3"
+    write_sqlite(sample_entries, str(path))
+    assert RefundingIndex(str(path)).rows("NOTE", 2) == [
+        row for row in sample_entries if row.Security_type is SecurityType.NOTE and row.Maturity == 2.0
+    ]
+
+
+def test_detect_format_rejects_unknown_extensions() -> None:
+    assert detect_format("out/refunding.parquet") == "parquet"
+    with pytest.raises(ValueError):
+        detect_format("refunding.xlsx")
+
+
+def test_http_service_answers_queries(csv_path: Path) -> None:
+    index = RefundingIndex(str(csv_path))
+    server = make_server(index, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{base}/pivot?security=NOTE&maturity=10") as response:
+            assert json.load(response) == index.pivot("NOTE", 10)
+        with urllib.request.urlopen(f"{base}/rows?security=NOTE&maturity=2&quarter=Q3%202025") as response:
+            rows = json.load(response)
+        assert len(rows) == len(index.rows("NOTE", 2, quarter="Q3 2025"))
+        assert rows[0]["Security_type"] == "NOTE"
+        with urllib.request.urlopen(f"{base}/quarters") as response:
+            assert json.load(response) == ["Q3 2025", "Q2 2025"]
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{base}/rows?security=CASH")
+        assert error.value.code == 400
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{base}/nothing")
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_analyze_without_numpy_exits_with_a_clear_message(
+    csv_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setitem(sys.modules, "numpy", None)
+    monkeypatch.delitem(sys.modules, "refunding_analytics", raising=False)
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--data", str(csv_path), "analyze", "coupon-totals"])
+    assert exit_info.value.code == 2
+    assert "requires numpy" in capsys.readouterr().err
+
+
+def test_parquet_data_without_pyarrow_exits_with_a_clear_message(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    path = tmp_path / "refunding_data.parquet"
+    path.write_bytes(b"PAR1")
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--data", str(path), "rows"])
+    assert exit_info.value.code == 2
+    assert "Parquet files require pyarrow" in capsys.readouterr().err
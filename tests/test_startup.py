@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from collect_refunding_data import check_new_quarters, main
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ("pdfplumber", "pdfminer", "bs4", "lxml", "requests", "urllib3", "sqlite3", "cProfile")
+
+
+def _loaded_heavy_modules(script: str) -> list[str]:
+    probe = f"{script}\nimport sys\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    completed = subprocess.run(
+        [sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    loaded = completed.stdout.strip().splitlines()[-1] if completed.stdout.strip() else ""
+    return [name for name in loaded.split(",") if name]
+
+
+def test_import_does_not_load_heavy_dependencies() -> None:
+    assert _loaded_heavy_modules("import collect_refunding_data") == []
+
+
+def test_check_path_never_loads_the_pdf_stack(index_cache_dir: Path, tmp_path: Path) -> None:
+    script = (
+        "import collect_refunding_data\n"
+        "try:\n"
+        f"    collect_refunding_data.main(['check', '--offline', '--cache-dir', {str(index_cache_dir)!r},"
+        f" '--output', {str(tmp_path / 'missing.csv')!r}])\n"
+        "except SystemExit:\n"
+        "    pass"
+    )
+    loaded = _loaded_heavy_modules(script)
+    assert "bs4" in loaded
+    assert "pdfplumber" not in loaded and "pdfminer" not in loaded
+
+
+def test_check_new_quarters_skips_known_quarters(fake_treasury) -> None:
+    assert check_new_quarters(max_quarters=2, known_quarters={(2025, 2)}) == [(2025, 3)]
+    assert check_new_quarters(max_quarters=2, known_quarters={(2025, 2), (2025, 3)}) == []
+
+
+def test_check_command_reports_new_quarters(
+    index_cache_dir: Path, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    args = ["check", "--offline", "--cache-dir", str(index_cache_dir), "--max-quarters", "2"]
+    with pytest.raises(SystemExit) as exit_info:
+        main(args + ["--output", str(tmp_path / "missing.csv")])
+    assert exit_info.value.code == 0
+    assert capsys.readouterr().out.strip() == "New quarters: Q3 2025, Q2 2025"
+
+    output = tmp_path / "refunding_data.csv"
+    output.write_text(
+        "Quarter_year,Date,Security_type,Maturity,Units,Auction_month,Auction_date,Offered_amount,Data_type,Notes\n"
+        "Q3 2025,2025-07-30,NOTE,2.0,YEARS,2025-08,,69.0,HISTORICAL_REFERENCE,\n"
+        "Q2 2025,2025-04-30,NOTE,2.0,YEARS,2025-05,,69.0,HISTORICAL_REFERENCE,\n",
+        encoding="utf-8",
+    )
+    with pytest.raises(SystemExit) as exit_info:
+        main(args + ["--output", str(output), "--exit-status"])
+    assert exit_info.value.code == 1
+    assert "No new quarters" in capsys.readouterr().out
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+import pytest
+
+import collect_refunding_data
+from collect_refunding_data import (
+    DataType,
+    HttpCache,
+    QuarterWatcher,
+    RunMetrics,
+    WatchState,
+    create_session,
+    diff_quarter_links,
+    next_poll_delay,
+    read_csv,
+)
+
+OFFICIAL_Q3 = "/news/press-releases/quarterly-refunding-2025-q3"
+RECOMMENDED_Q3 = "/system/files/221/TBACRecommended-Financing-Q3-2025.pdf"
+SEED_CSV = (
+    "Quarter_year,Date,Security_type,Maturity,Units,Auction_month,Auction_date,Offered_amount,Data_type,Notes\n"
+    "Q2 2025,2025-04-30,NOTE,2.0,YEARS,2025-05,,69.0,HISTORICAL_REFERENCE,\n"
+)
+
+
+@pytest.fixture
+def treasury_stand_in(stand_in_server, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(collect_refunding_data, "BASE_URL", stand_in_server.url(""))
+    monkeypatch.setattr(collect_refunding_data, "OFFICIAL_REMARKS_URL", stand_in_server.url("/official-index"))
+    monkeypatch.setattr(collect_refunding_data, "RECOMMENDED_TABLES_URL", stand_in_server.url("/recommended-index"))
+    return stand_in_server
+
+
+def _without_link(html: str, href: str) -> bytes:
+    return re.sub(rf'<a href="{re.escape(href)}"[^>]*>[^<]*</a>', "", html).encode("utf-8")
+
+
+def _watcher(tmp_path: Path, **kwargs) -> QuarterWatcher:
+    return QuarterWatcher(
+        str(tmp_path / "refunding_data.csv"),
+        WatchState(str(tmp_path / "watch_state.json")),
+        session=create_session(retries=0, rate_limit=None),
+        cache=HttpCache(str(tmp_path / "cache")),
+        parse_workers=1,
+        **kwargs,
+    )
+
+
+def test_watcher_fetches_only_newly_published_quarters(
+    treasury_stand_in, stand_in_response, index_html_loader, official_html_loader, recommended_pdf_loader, tmp_path
+) -> None:
+    for name, href in (("official", OFFICIAL_Q3), ("recommended", RECOMMENDED_Q3)):
+        html = index_html_loader(name)
+        treasury_stand_in.route(
+            f"/{name}-index",
+            stand_in_response(200, _without_link(html, href), {"ETag": '"before"'}),
+            stand_in_response(304, b"", {"ETag": '"before"'}),
+            stand_in_response(200, html.encode("utf-8"), {"ETag": '"after"'}),
+            stand_in_response(304, b"", {"ETag": '"after"'}),
+        )
+    treasury_stand_in.route(OFFICIAL_Q3, stand_in_response(200, official_html_loader("Q3 2025").encode("utf-8")))
+    treasury_stand_in.route(RECOMMENDED_Q3, stand_in_response(200, recommended_pdf_loader("Q3 2025")))
+    output = tmp_path / "refunding_data.csv"
+    output.write_text(SEED_CSV, encoding="utf-8")
+    metrics = RunMetrics()
+    watcher = _watcher(tmp_path, metrics=metrics, max_quarters=1)
+
+    assert watcher.poll() == []
+    assert watcher.poll() == []
+    assert treasury_stand_in.requests[-1][2].get("If-None-Match") == '"before"'
+    assert watcher.idle_polls == 2
+
+    assert watcher.poll() == [(2025, 3)]
+    rows = read_csv(str(output))
+    assert [row.Quarter_year for row in rows if row.Quarter_year == "Q2 2025"] == ["Q2 2025"]
+    assert any(row.Data_type is DataType.RECOMMENDATION_FOR_THIS_REFUNDING for row in rows)
+    assert rows[0].Quarter_year == "Q3 2025"
+
+    assert watcher.poll() == []
+    assert treasury_stand_in.hits(OFFICIAL_Q3) == treasury_stand_in.hits(RECOMMENDED_Q3) == 1
+    assert metrics.report()["counters"]["watch_quarters_fetched"] == 1
+
+    restarted = _watcher(tmp_path)
+    assert restarted.state.official_links[(2025, 3)].endswith(OFFICIAL_Q3)
+    assert restarted.poll() == []
+    assert treasury_stand_in.hits(OFFICIAL_Q3) == 1
+
+
+def test_watcher_keeps_polling_after_failures(treasury_stand_in, stand_in_response, tmp_path) -> None:
+    treasury_stand_in.route("/official-index", stand_in_response(503, b"unavailable"))
+    treasury_stand_in.route("/recommended-index", stand_in_response(503, b"unavailable"))
+    sleeps: List[float] = []
+    metrics = RunMetrics()
+    watcher = _watcher(
+        tmp_path,
+        metrics=metrics,
+        interval=60.0,
+        max_interval=3600.0,
+        now=lambda: datetime(2025, 6, 15, 12, 0),
+        sleep=sleeps.append,
+    )
+    watcher.run(max_polls=3)
+    assert sleeps == [120.0, 240.0]
+    assert metrics.report()["counters"]["watch_poll_failures"] == 3
+    assert not (tmp_path / "watch_state.json").exists()
+
+
+def test_watcher_gives_up_on_a_quarter_with_a_corrupt_document(
+    treasury_stand_in,
+    stand_in_response,
+    index_html_loader,
+    official_html_loader,
+    tmp_path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(collect_refunding_data, "WATCH_MAX_QUARTER_FAILURES", 2)
+    for name in ("official", "recommended"):
+        treasury_stand_in.route(f"/{name}-index", stand_in_response(200, index_html_loader(name).encode("utf-8")))
+    treasury_stand_in.route(OFFICIAL_Q3, stand_in_response(200, official_html_loader("Q3 2025").encode("utf-8")))
+    treasury_stand_in.route(RECOMMENDED_Q3, stand_in_response(200, b"%PDF-1.4 truncated"))
+    output = tmp_path / "refunding_data.csv"
+    output.write_text(SEED_CSV, encoding="utf-8")
+    sleeps: List[float] = []
+    metrics = RunMetrics()
+    watcher = _watcher(tmp_path, metrics=metrics, max_quarters=1, now=lambda: datetime(2025, 8, 5), sleep=sleeps.append)
+
+    assert watcher.poll() == []
+    state = WatchState(str(tmp_path / "watch_state.json"))
+    assert state.failures == {(2025, 3): 1}
+    assert (2025, 3) not in state.recommended_links
+
+    watcher.run(max_polls=2)
+    assert len(sleeps) == 1
+    assert output.read_text(encoding="utf-8") == SEED_CSV
+    state = WatchState(str(tmp_path / "watch_state.json"))
+    assert state.failures == {}
+    assert state.recommended_links[(2025, 3)].endswith(RECOMMENDED_Q3)
+    counters = metrics.report()["counters"]
+    assert counters["watch_quarter_failures"] == 2
+    assert "watch_poll_failures" not in counters
+    assert watcher.idle_polls == 3
+
+
+def test_watch_state_rereads_the_output_only_when_it_changes(tmp_path, monkeypatch: pytest.MonkeyPatch) -> None:
+    reads: List[str] = []
+    existing_quarters = collect_refunding_data.existing_quarters
+
+    def counting_existing_quarters(path: str, *args) -> set:
+        reads.append(path)
+        return existing_quarters(path, *args)
+
+    monkeypatch.setattr(collect_refunding_data, "existing_quarters", counting_existing_quarters)
+    output = tmp_path / "refunding_data.csv"
+    state = WatchState(str(tmp_path / "watch_state.json"))
+    assert state.collected_quarters(str(output)) == set()
+
+    output.write_text(SEED_CSV, encoding="utf-8")
+    assert state.collected_quarters(str(output)) == {(2025, 2)}
+    assert state.collected_quarters(str(output)) == {(2025, 2)}
+    assert len(reads) == 1
+
+    output.write_text(SEED_CSV + SEED_CSV.splitlines()[1].replace("Q2", "Q3") + "\n", encoding="utf-8")
+    state.record_appended(str(output), (2025, 3))
+    assert state.collected_quarters(str(output)) == {(2025, 3), (2025, 2)}
+    assert len(reads) == 1
+
+    output.write_text(SEED_CSV.replace("Q2", "Q1") + SEED_CSV.splitlines()[1] + "\n", encoding="utf-8")
+    assert state.collected_quarters(str(output)) == {(2025, 2), (2025, 1)}
+    assert len(reads) == 2
+
+
+def test_poll_delay_tightens_around_announcement_dates() -> None:
+    assert next_poll_delay(datetime(2025, 8, 5, 9, 0), idle_polls=10, interval=300, max_interval=21600) == 300
+    assert next_poll_delay(datetime(2025, 6, 15), idle_polls=0, interval=300, max_interval=21600) == 300
+    assert next_poll_delay(datetime(2025, 6, 15), idle_polls=3, interval=300, max_interval=21600) == 2400
+    assert next_poll_delay(datetime(2025, 6, 15), idle_polls=10, interval=300, max_interval=21600) == 21600
+    assert next_poll_delay(datetime(2025, 7, 30, 12, 0), idle_polls=10, interval=300, max_interval=21600) == 300
+    assert next_poll_delay(datetime(2025, 4, 30, 12, 0), idle_polls=10, interval=300, max_interval=21600) == 300
+    assert next_poll_delay(datetime(2025, 7, 24, 23, 0), idle_polls=10, interval=300, max_interval=21600) == 3600
+    assert next_poll_delay(datetime(2025, 8, 11, 0, 0), idle_polls=10, interval=300, max_interval=21600) == 21600
+    assert next_poll_delay(datetime(2025, 12, 31, 23, 50), idle_polls=10, interval=300, max_interval=21600) == 21600
+
+
+def test_diff_reports_new_and_relinked_quarters() -> None:
+    previous = {(2025, 2): ("a", "b"), (2025, 1): ("c", "d")}
+    current = {(2025, 3): ("e", "f"), (2025, 2): ("a", "b2"), (2025, 1): ("c", "d")}
+    assert diff_quarter_links(previous, current) == [(2025, 3), (2025, 2)]
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import sqlite3
+import sys
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+import collect_refunding_data
+from collect_refunding_data import (
+    READERS,
+    SQLITE_TABLE,
+    WRITERS,
+    SecurityType,
+    collect_data,
+    main,
+    read_csv,
+    write_csv,
+    write_parquet,
+    write_sqlite,
+)
+
+
+@pytest.fixture
+def sample_entries(fake_treasury):
+    return collect_data(max_quarters=2, session=fake_treasury, parse_workers=1)
+
+
+def test_writers_registry_covers_supported_formats() -> None:
+    assert set(WRITERS) == {"csv", "parquet", "sqlite"}
+
+
+def test_write_sqlite_stores_typed_indexed_rows(sample_entries, tmp_path: Path) -> None:
+    output = tmp_path / "refunding_data.sqlite3"
+    assert write_sqlite(sample_entries, str(output)) == len(sample_entries)
+    connection = sqlite3.connect(output)
+    try:
+        total = connection.execute(
+            f"SELECT SUM(Offered_amount) FROM {SQLITE_TABLE} WHERE Security_type = 'NOTE' AND Maturity = 2.0"
+        ).fetchone()[0]
+        indexes = connection.execute(f"PRAGMA index_list({SQLITE_TABLE})").fetchall()
+    finally:
+        connection.close()
+    expected = sum(
+        float(entry.Offered_amount)
+        for entry in sample_entries
+        if entry.Security_type == "NOTE" and entry.Maturity == 2.0
+    )
+    assert total == pytest.approx(expected)
+    assert indexes
+
+
+def test_write_parquet_matches_csv_rows(sample_entries, tmp_path: Path) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    output = tmp_path / "refunding_data.parquet"
+    write_parquet(sample_entries, str(output))
+    table = pq.read_table(output)
+    assert table.num_rows == len(sample_entries)
+    assert str(table.schema.field("Offered_amount").type) == "double"
+    assert table.column("Auction_month")[0].as_py() == date(2025, 2, 1)
+
+    csv_path = tmp_path / "refunding_data.csv"
+    write_csv(sample_entries, str(csv_path))
+    csv_rows = read_csv(str(csv_path))
+    assert [float(row.Offered_amount) for row in csv_rows] == table.column("Offered_amount").to_pylist()
+
+
+def test_csv_round_trip_restores_typed_rows(sample_entries, tmp_path: Path) -> None:
+    output = tmp_path / "refunding_data.csv"
+    write_csv(sample_entries, str(output))
+    restored = read_csv(str(output))
+    assert restored == sample_entries
+    assert isinstance(restored[0].Security_type, SecurityType)
+    assert restored[0].as_csv_dict()["Security_type"] == "NOTE"
+    assert all(row.Maturity is None or isinstance(row.Maturity, float) for row in restored)
+
+
+@pytest.mark.parametrize("output_format", sorted(WRITERS))
+def test_readers_restore_rows_from_every_output_format(output_format: str, sample_entries, tmp_path: Path) -> None:
+    if output_format == "parquet":
+        pytest.importorskip("pyarrow.parquet")
+    output = tmp_path / f"refunding_data.{output_format}"
+    WRITERS[output_format](sample_entries, str(output), False)
+    assert READERS[output_format](str(output)) == sample_entries
+
+
+@pytest.mark.parametrize("output_format", sorted(WRITERS))
+def test_failed_write_keeps_written_rows_in_the_partial_file(
+    output_format: str, sample_entries, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    if output_format == "parquet":
+        pytest.importorskip("pyarrow.parquet")
+    monkeypatch.setattr(collect_refunding_data, "OUTPUT_BATCH_SIZE", 5)
+
+    def failing_entries():
+        yield from sample_entries[:12]
+        raise RuntimeError("collection failed")
+
+    output = tmp_path / f"refunding_data.{output_format}"
+    with pytest.raises(RuntimeError):
+        WRITERS[output_format](failing_entries(), str(output), True)
+    assert not output.exists()
+    assert READERS[output_format](f"{output}.partial") == sample_entries[:12]
+
+
+def test_parquet_commands_without_pyarrow_exit_with_a_clear_message(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    output = tmp_path / "refunding_data.parquet"
+    for argv in (["--format", "parquet"], ["check", "--format", "parquet"]):
+        with pytest.raises(SystemExit) as exit_info:
+            main(argv + ["--offline", "--cache-dir", str(tmp_path / "cache"), "--output", str(output)])
+        assert exit_info.value.code == 2
+        assert "Parquet files require pyarrow" in capsys.readouterr().err
+    assert not output.exists()